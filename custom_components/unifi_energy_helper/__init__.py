@@ -8,7 +8,9 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 
-from .const import DOMAIN
+from .const import DOMAIN, SERVICE_RECOMPUTE
+from .dispatcher import UniFiEnergyRegistryDispatcher, UniFiEnergyStateDispatcher
+from .recompute import async_register_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -19,17 +21,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up UniFi Energy Helper from a config entry."""
     hass.data.setdefault(DOMAIN, {})
 
+    # One registry listener for the whole integration, shared by all entities
+    registry_dispatcher = UniFiEnergyRegistryDispatcher(hass)
+    registry_dispatcher.async_start()
+    hass.data[DOMAIN]["registry_dispatcher"] = registry_dispatcher
+    entry.async_on_unload(registry_dispatcher.async_stop)
+
+    # One state change listener for all tracked power entities
+    state_dispatcher = UniFiEnergyStateDispatcher(hass)
+    hass.data[DOMAIN]["state_dispatcher"] = state_dispatcher
+    entry.async_on_unload(state_dispatcher.async_stop)
+
+    async_register_services(hass)
+
+    # Reload to apply changed options
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+
     # Only set up sensor platform initially - it will trigger button setup
     await hass.config_entries.async_forward_entry_setups(entry, [Platform.SENSOR])
 
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id, None)
+        hass.services.async_remove(DOMAIN, SERVICE_RECOMPUTE)
+
+        # The sensors added their final increments while being unloaded
+        if energy_store := hass.data[DOMAIN].pop("energy_store", None):
+            await energy_store.async_save()
 
     return unload_ok
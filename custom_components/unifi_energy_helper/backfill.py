@@ -0,0 +1,196 @@
+"""Recorder history backfill for UniFi Energy Helper."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+import logging
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.components.recorder.db_schema import RecorderRuns
+from homeassistant.components.recorder.models import process_timestamp
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant, State
+from homeassistant.util import dt as dt_util
+
+from .accumulator import EnergyAccumulator
+from .const import BACKFILL_MAX_AGE
+from .discovery import power_from_state
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds to wait for the recorder's database, e.g. while it migrates
+_DB_READY_TIMEOUT = 30.0
+
+
+@dataclass(slots=True)
+class PowerHistory:
+    """Recorded power of an entity since its start time."""
+
+    start_time: float
+    # The state the entity had at the start time, if it was recorded
+    start_state: State | None = None
+    # States recorded after the start time
+    states: list[State] = field(default_factory=list)
+    # Times Home Assistant stopped recording after the start time, and
+    # whether it crashed
+    stops: list[tuple[float, bool]] = field(default_factory=list)
+
+
+async def async_get_power_history(
+    hass: HomeAssistant, start_times: Mapping[str, float]
+) -> dict[str, PowerHistory]:
+    """Return the recorded power of entities since their start times.
+
+    All entities are read in one query from the earliest start time, together
+    with the recorder runs, in the recorder's executor. Start times are capped
+    at BACKFILL_MAX_AGE and the recorder's purge_keep_days, so a reading from
+    months ago does not load months of history for every port. Returns an
+    empty dict without the recorder or its database.
+    """
+    if not start_times:
+        return {}
+    if "recorder" not in hass.config.components:
+        _LOGGER.debug("Recorder not loaded, skipping the history backfill")
+        return {}
+
+    recorder = get_instance(hass)
+    try:
+        async with asyncio.timeout(_DB_READY_TIMEOUT):
+            db_ready = await asyncio.shield(recorder.async_db_ready)
+    except TimeoutError:
+        db_ready = False
+    if not db_ready:
+        _LOGGER.warning("Recorder database not ready, skipping the history backfill")
+        return {}
+
+    cutoff = dt_util.utcnow().timestamp() - min(
+        BACKFILL_MAX_AGE, recorder.keep_days * 86400
+    )
+    start_times = {
+        entity_id: max(start, cutoff) for entity_id, start in start_times.items()
+    }
+    start_time = dt_util.utc_from_timestamp(min(start_times.values()))
+    recorded = await recorder.async_add_executor_job(
+        get_power_history, hass, start_time, None, list(start_times), True
+    )
+    stops = await recorder.async_add_executor_job(
+        get_recording_stops, hass, start_time
+    )
+
+    # The query starts at the earliest window, split it at the later ones
+    power_history: dict[str, PowerHistory] = {}
+    for entity_id, entity_start in start_times.items():
+        entity_history = PowerHistory(
+            entity_start,
+            stops=[stop for stop in stops if stop[0] > entity_start],
+        )
+        for state in recorded.get(entity_id, ()):
+            if not isinstance(state, State):
+                continue
+            if state.last_updated_timestamp <= entity_start:
+                entity_history.start_state = state
+            else:
+                entity_history.states.append(state)
+        power_history[entity_id] = entity_history
+    return power_history
+
+
+def backfill_slot(
+    accumulator: EnergyAccumulator, slot: int, power_history: PowerHistory
+) -> None:
+    """Integrate the recorded power of a slot restored at the start time.
+
+    The recorder only stores changes, so a recorded power holds until the next
+    recorded state: while Home Assistant was recording, the history is
+    authoritative and the restored outage is dropped. Only a stop of Home
+    Assistant starts an outage, closed by the next recorded state with the gap
+    policy. After a crash the stop time is unknown, so the outage starts at
+    the last reading. A reading older than the capped start time is followed
+    by downtime until the start time, also closed with the gap policy.
+    """
+    power_watts = power_from_state(power_history.start_state)
+    if power_history.start_time > accumulator.timestamp[slot]:
+        accumulator.mark_outage(slot, accumulator.timestamp[slot])
+        if power_watts is not None:
+            accumulator.integrate(slot, power_history.start_time, power_watts)
+    elif power_watts is not None:
+        accumulator.cancel_outage(slot)
+        accumulator.set_reading(slot, power_history.start_time, power_watts)
+
+    stops = iter(power_history.stops)
+    stop = next(stops, None)
+    for state in power_history.states:
+        timestamp = state.last_updated_timestamp
+        while stop is not None and stop[0] <= timestamp:
+            mark_stop(accumulator, slot, stop)
+            stop = next(stops, None)
+        if (power_watts := power_from_state(state)) is None:
+            accumulator.mark_outage(slot, timestamp)
+        else:
+            accumulator.integrate(slot, timestamp, power_watts)
+
+    # Stops after the last recorded state, e.g. the restart just before now
+    while stop is not None:
+        mark_stop(accumulator, slot, stop)
+        stop = next(stops, None)
+
+
+def mark_stop(
+    accumulator: EnergyAccumulator, slot: int, stop: tuple[float, bool]
+) -> None:
+    """Start an outage where Home Assistant stopped recording.
+
+    After a clean stop the last reading is integrated up to the stop time.
+    """
+    timestamp, crashed = stop
+    if crashed:
+        accumulator.mark_outage(slot, accumulator.timestamp[slot])
+    else:
+        accumulator.advance(slot, timestamp)
+        accumulator.mark_outage(slot, timestamp)
+
+
+def get_power_history(
+    hass: HomeAssistant,
+    start_time: datetime,
+    end_time: datetime | None,
+    entity_ids: list[str],
+    include_start_time_state: bool = False,
+) -> Mapping[str, list[State | dict]]:
+    """Read every recorded state change of the entities in a period.
+
+    Runs blocking database I/O, use the recorder's executor.
+    """
+    return history.get_significant_states(
+        hass,
+        start_time,
+        end_time,
+        entity_ids,
+        include_start_time_state=include_start_time_state,
+        significant_changes_only=False,
+        no_attributes=True,
+    )
+
+
+def get_recording_stops(
+    hass: HomeAssistant, start_time: datetime
+) -> list[tuple[float, bool]]:
+    """Return when recorder runs after start_time ended, and if they crashed.
+
+    A crashed run is ended when the next run starts, so that is its stop time.
+    Runs blocking database I/O, use the recorder's executor.
+    """
+    with session_scope(hass=hass, read_only=True) as session:
+        runs = (
+            session.query(RecorderRuns.end, RecorderRuns.closed_incorrect)
+            .filter(RecorderRuns.end > start_time)
+            .order_by(RecorderRuns.end)
+            .all()
+        )
+    return [
+        (process_timestamp(end).timestamp(), bool(closed_incorrect))
+        for end, closed_incorrect in runs
+    ]
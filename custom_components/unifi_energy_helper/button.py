@@ -13,6 +13,7 @@ from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
+from .discovery import async_get_unifi_device_info
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -87,6 +88,9 @@ class UniFiEnergyResetButton(ButtonEntity):
         if config_entry_id:
             self._attr_config_entry_id = config_entry_id
 
+        # Link to the existing UniFi device while being registered
+        self._attr_device_info = async_get_unifi_device_info(hass, device_id)
+
         # Extract name from the energy sensor
         energy_name = energy_sensor._attr_name or "Energy"  # noqa: SLF001
 
@@ -131,13 +135,6 @@ class UniFiEnergyResetButton(ButtonEntity):
             self._attr_name = new_name
             self.async_write_ha_state()
 
-    @property
-    def device_info(self) -> dict[str, Any] | None:
-        """Return device info to link this button to the UniFi device."""
-        # We don't create a new device; we link to the existing UniFi device
-        # by not providing device_info. The device_id will be set in the registry.
-        return None
-
     async def async_internal_added_to_hass(self) -> None:
         """Call when the entity is added to hass (including when enabled)."""
         await super().async_internal_added_to_hass()
@@ -155,44 +152,55 @@ class UniFiEnergyResetButton(ButtonEntity):
         """Handle entity which will be added."""
         await super().async_added_to_hass()
 
-        # Register this entity with the same device as the energy sensor
         entity_registry = er.async_get(self.hass)
 
-        @callback
-        def _async_update_device():
-            """Update device_id for this entity."""
-            if self.entity_id:
-                entity_registry.async_update_entity(
-                    self.entity_id,
-                    device_id=self._device_id,
-                )
-                _LOGGER.debug("Linked %s to device %s", self.entity_id, self._device_id)
-
-        # Call the callback directly to update the device
-        _async_update_device()
-        
         # Listen for energy sensor name changes
         @callback
         def _async_handle_sensor_registry_update(event: Event) -> None:
             """Handle energy sensor registry updates to sync button names."""
             if event.data.get("action") != "update":
                 return
-            
-            if not hasattr(self._energy_sensor, "entity_id"):
-                return
-            
-            updated_entity_id = event.data.get("entity_id")
-            if updated_entity_id != self._energy_sensor.entity_id:
-                return
-            
+
             changes = event.data.get("changes", {})
             # Check if name changed
             if "name" in changes:
                 self._update_name_from_energy_sensor()
-        
-        self._unsub_registry = self.hass.bus.async_listen(
-            er.EVENT_ENTITY_REGISTRY_UPDATED,
-            _async_handle_sensor_registry_update,
+
+        registry_dispatcher = self.hass.data[DOMAIN]["registry_dispatcher"]
+
+        # The sensor may still be in the middle of being added, in which case
+        # its entity_id is only known to the registry (from a previous run)
+        sensor_entity_id = self._energy_sensor.entity_id or (
+            entity_registry.async_get_entity_id(
+                "sensor", DOMAIN, self._energy_sensor.unique_id
+            )
+        )
+        if sensor_entity_id:
+            # The dispatcher only calls us for our own energy sensor, and
+            # follows its renames
+            self._unsub_registry = registry_dispatcher.async_listen(
+                sensor_entity_id, _async_handle_sensor_registry_update
+            )
+            return
+
+        # On a fresh install, subscribe once the sensor gets registered
+        @callback
+        def _async_handle_sensor_registry_create(event: Event) -> None:
+            """Subscribe to the energy sensor's updates once it is registered."""
+            if event.data.get("action") != "create":
+                return
+            created_entity_id = event.data["entity_id"]
+            if created_entity_id != entity_registry.async_get_entity_id(
+                "sensor", DOMAIN, self._energy_sensor.unique_id
+            ):
+                return
+            self._unsub_registry()
+            self._unsub_registry = registry_dispatcher.async_listen(
+                created_entity_id, _async_handle_sensor_registry_update
+            )
+
+        self._unsub_registry = registry_dispatcher.async_listen_all(
+            _async_handle_sensor_registry_create
         )
 
     async def async_press(self) -> None:
@@ -4,34 +4,73 @@ from __future__ import annotations
 import logging
 from typing import Any
 
+import voluptuous as vol
+
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
-from homeassistant.helpers import entity_registry as er
 
-from .const import DOMAIN, UNIFI_DOMAIN
+from .const import (
+    ATTRIBUTE_POLICY_ALL,
+    ATTRIBUTE_POLICY_STATIC,
+    BOUNDARY_SPLIT_5MINUTE,
+    BOUNDARY_SPLIT_HOUR,
+    BOUNDARY_SPLIT_OFF,
+    CONF_ATTRIBUTE_POLICY,
+    CONF_BACKFILL_HISTORY,
+    CONF_BOUNDARY_SPLIT,
+    CONF_DEVICE_AGGREGATES,
+    CONF_GAP_MAX_AGE,
+    CONF_GAP_POLICY,
+    CONF_INTEGRATION_METHOD,
+    CONF_PUBLISH_HEARTBEAT,
+    CONF_PUBLISH_MAX_AGE,
+    CONF_PUBLISH_MIN_DELTA,
+    CONF_PUBLISH_MIN_INTERVAL,
+    CONF_PUBLISH_REPORT_INTERVAL,
+    CONF_ROLLUP_AGGREGATES,
+    CONF_SCAN_INTERVAL,
+    CONF_STATISTICS_ONLY,
+    CONF_STORE_SAVE_DELAY,
+    CONF_UPDATE_MODE,
+    CONF_WRITE_DEBOUNCE,
+    DEFAULT_ATTRIBUTE_POLICY,
+    DEFAULT_BACKFILL_HISTORY,
+    DEFAULT_BOUNDARY_SPLIT,
+    DEFAULT_DEVICE_AGGREGATES,
+    DEFAULT_GAP_MAX_AGE,
+    DEFAULT_GAP_POLICY,
+    DEFAULT_INTEGRATION_METHOD,
+    DEFAULT_PUBLISH_HEARTBEAT,
+    DEFAULT_PUBLISH_MAX_AGE,
+    DEFAULT_PUBLISH_MIN_DELTA,
+    DEFAULT_PUBLISH_MIN_INTERVAL,
+    DEFAULT_PUBLISH_REPORT_INTERVAL,
+    DEFAULT_ROLLUP_AGGREGATES,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STATISTICS_ONLY,
+    DEFAULT_STORE_SAVE_DELAY,
+    DEFAULT_UPDATE_MODE,
+    DEFAULT_WRITE_DEBOUNCE,
+    DOMAIN,
+    GAP_POLICY_DROP,
+    GAP_POLICY_HOLD,
+    GAP_POLICY_INTERPOLATE,
+    INTEGRATION_METHOD_LEFT,
+    INTEGRATION_METHOD_RIGHT,
+    INTEGRATION_METHOD_TRAPEZOIDAL,
+    UPDATE_MODE_EVENT,
+    UPDATE_MODE_INTERVAL,
+)
+from .discovery import async_get_unifi_power_entities
 
 _LOGGER = logging.getLogger(__name__)
 
 
-async def _async_has_unifi_poe_devices(hass: HomeAssistant) -> bool:
+@callback
+def _async_has_unifi_poe_devices(hass: HomeAssistant) -> bool:
     """Check if there are any UniFi PoE or PDU power devices available."""
-    entity_registry = er.async_get(hass)
-    
-    for entity_id, entry in entity_registry.entities.items():
-        if (
-            entry.platform == UNIFI_DOMAIN
-            and entity_id.startswith("sensor.")
-            and entry.device_id
-            and (
-                "poe" in entity_id.lower() 
-                or "port" in entity_id.lower()
-                or "pdu" in entity_id.lower()
-                or "outlet" in entity_id.lower()
-            )
-        ):
-            return True
-    return False
+    return bool(async_get_unifi_power_entities(hass))
 
 
 class UniFiEnergyHelperConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -39,6 +78,14 @@ class UniFiEnergyHelperConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> UniFiEnergyHelperOptionsFlow:
+        """Get the options flow for this handler."""
+        return UniFiEnergyHelperOptionsFlow(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -48,7 +95,7 @@ class UniFiEnergyHelperConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             return self.async_abort(reason="single_instance_allowed")
 
         # Check if UniFi integration is available with PoE devices
-        if not await _async_has_unifi_poe_devices(self.hass):
+        if not _async_has_unifi_poe_devices(self.hass):
             return self.async_abort(reason="no_unifi_poe_devices")
 
         if user_input is not None:
@@ -63,3 +110,142 @@ class UniFiEnergyHelperConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             return self.async_abort(reason="single_instance_allowed")
 
         return self.async_create_entry(title="UniFi Energy Helper", data={})
+
+
+class UniFiEnergyHelperOptionsFlow(config_entries.OptionsFlow):
+    """Handle UniFi Energy Helper options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self._config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_UPDATE_MODE,
+                        default=options.get(CONF_UPDATE_MODE, DEFAULT_UPDATE_MODE),
+                    ): vol.In([UPDATE_MODE_EVENT, UPDATE_MODE_INTERVAL]),
+                    vol.Optional(
+                        CONF_SCAN_INTERVAL,
+                        default=options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=5, max=3600)),
+                    vol.Optional(
+                        CONF_INTEGRATION_METHOD,
+                        default=options.get(
+                            CONF_INTEGRATION_METHOD, DEFAULT_INTEGRATION_METHOD
+                        ),
+                    ): vol.In(
+                        [
+                            INTEGRATION_METHOD_LEFT,
+                            INTEGRATION_METHOD_RIGHT,
+                            INTEGRATION_METHOD_TRAPEZOIDAL,
+                        ]
+                    ),
+                    vol.Optional(
+                        CONF_GAP_POLICY,
+                        default=options.get(CONF_GAP_POLICY, DEFAULT_GAP_POLICY),
+                    ): vol.In(
+                        [GAP_POLICY_DROP, GAP_POLICY_HOLD, GAP_POLICY_INTERPOLATE]
+                    ),
+                    vol.Optional(
+                        CONF_GAP_MAX_AGE,
+                        default=options.get(CONF_GAP_MAX_AGE, DEFAULT_GAP_MAX_AGE),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_ATTRIBUTE_POLICY,
+                        default=options.get(
+                            CONF_ATTRIBUTE_POLICY, DEFAULT_ATTRIBUTE_POLICY
+                        ),
+                    ): vol.In([ATTRIBUTE_POLICY_ALL, ATTRIBUTE_POLICY_STATIC]),
+                    vol.Optional(
+                        CONF_WRITE_DEBOUNCE,
+                        default=options.get(
+                            CONF_WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0, max=60)),
+                    vol.Optional(
+                        CONF_PUBLISH_MIN_DELTA,
+                        default=options.get(
+                            CONF_PUBLISH_MIN_DELTA, DEFAULT_PUBLISH_MIN_DELTA
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_PUBLISH_MIN_INTERVAL,
+                        default=options.get(
+                            CONF_PUBLISH_MIN_INTERVAL, DEFAULT_PUBLISH_MIN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_PUBLISH_HEARTBEAT,
+                        default=options.get(
+                            CONF_PUBLISH_HEARTBEAT, DEFAULT_PUBLISH_HEARTBEAT
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_PUBLISH_MAX_AGE,
+                        default=options.get(
+                            CONF_PUBLISH_MAX_AGE, DEFAULT_PUBLISH_MAX_AGE
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_PUBLISH_REPORT_INTERVAL,
+                        default=options.get(
+                            CONF_PUBLISH_REPORT_INTERVAL,
+                            DEFAULT_PUBLISH_REPORT_INTERVAL,
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_BOUNDARY_SPLIT,
+                        default=options.get(
+                            CONF_BOUNDARY_SPLIT, DEFAULT_BOUNDARY_SPLIT
+                        ),
+                    ): vol.In(
+                        [
+                            BOUNDARY_SPLIT_OFF,
+                            BOUNDARY_SPLIT_HOUR,
+                            BOUNDARY_SPLIT_5MINUTE,
+                        ]
+                    ),
+                    vol.Optional(
+                        CONF_STATISTICS_ONLY,
+                        default=options.get(
+                            CONF_STATISTICS_ONLY, DEFAULT_STATISTICS_ONLY
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_STORE_SAVE_DELAY,
+                        default=options.get(
+                            CONF_STORE_SAVE_DELAY, DEFAULT_STORE_SAVE_DELAY
+                        ),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1, max=900)),
+                    vol.Optional(
+                        CONF_BACKFILL_HISTORY,
+                        default=options.get(
+                            CONF_BACKFILL_HISTORY, DEFAULT_BACKFILL_HISTORY
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_DEVICE_AGGREGATES,
+                        default=options.get(
+                            CONF_DEVICE_AGGREGATES, DEFAULT_DEVICE_AGGREGATES
+                        ),
+                    ): bool,
+                    vol.Optional(
+                        CONF_ROLLUP_AGGREGATES,
+                        default=options.get(
+                            CONF_ROLLUP_AGGREGATES, DEFAULT_ROLLUP_AGGREGATES
+                        ),
+                    ): bool,
+                }
+            ),
+        )
@@ -2,14 +2,95 @@
 
 DOMAIN = "unifi_energy_helper"
 CONF_SCAN_INTERVAL = "scan_interval"
-DEFAULT_SCAN_INTERVAL = 60  # seconds
+DEFAULT_SCAN_INTERVAL = 60  # seconds, only used in interval update mode
+
+# Update modes
+CONF_UPDATE_MODE = "update_mode"
+UPDATE_MODE_EVENT = "event"
+UPDATE_MODE_INTERVAL = "interval"
+DEFAULT_UPDATE_MODE = UPDATE_MODE_EVENT
+
+# Integration methods
+CONF_INTEGRATION_METHOD = "integration_method"
+INTEGRATION_METHOD_LEFT = "left"
+INTEGRATION_METHOD_RIGHT = "right"
+INTEGRATION_METHOD_TRAPEZOIDAL = "trapezoidal"
+DEFAULT_INTEGRATION_METHOD = INTEGRATION_METHOD_LEFT
+
+# Gap policies, for intervals in which the power entity was unavailable
+CONF_GAP_POLICY = "gap_policy"
+GAP_POLICY_DROP = "drop"
+GAP_POLICY_HOLD = "hold"
+GAP_POLICY_INTERPOLATE = "interpolate"
+DEFAULT_GAP_POLICY = GAP_POLICY_HOLD
+CONF_GAP_MAX_AGE = "gap_max_age"
+DEFAULT_GAP_MAX_AGE = 900.0  # seconds, 0 holds the last reading without limit
+
+# Statistics boundaries at which accumulation is split
+CONF_BOUNDARY_SPLIT = "boundary_split"
+BOUNDARY_SPLIT_OFF = "off"
+BOUNDARY_SPLIT_HOUR = "hour"
+BOUNDARY_SPLIT_5MINUTE = "5minute"
+DEFAULT_BOUNDARY_SPLIT = BOUNDARY_SPLIT_OFF
+
+# Port energy only as hourly external statistics, without live port states
+CONF_STATISTICS_ONLY = "statistics_only"
+DEFAULT_STATISTICS_ONLY = False
+
+# Options
+CONF_WRITE_DEBOUNCE = "write_debounce"
+DEFAULT_WRITE_DEBOUNCE = 0.0  # seconds, 0 flushes on the next loop iteration
+CONF_PUBLISH_MIN_DELTA = "publish_min_delta"
+DEFAULT_PUBLISH_MIN_DELTA = 0.0  # kWh, 0 publishes every change
+CONF_PUBLISH_MIN_INTERVAL = "publish_min_interval"
+DEFAULT_PUBLISH_MIN_INTERVAL = 0.0  # seconds
+CONF_PUBLISH_HEARTBEAT = "publish_heartbeat"
+DEFAULT_PUBLISH_HEARTBEAT = 0.0  # seconds, 0 disables the heartbeat
+CONF_PUBLISH_MAX_AGE = "publish_max_age"
+DEFAULT_PUBLISH_MAX_AGE = 0.0  # seconds, 0 disables catching up stale sensors
+CONF_PUBLISH_REPORT_INTERVAL = "publish_report_interval"
+DEFAULT_PUBLISH_REPORT_INTERVAL = 300.0  # seconds, 0 publishes reports like changes
+CONF_DEVICE_AGGREGATES = "device_aggregates"
+DEFAULT_DEVICE_AGGREGATES = False
+CONF_ROLLUP_AGGREGATES = "rollup_aggregates"
+DEFAULT_ROLLUP_AGGREGATES = False
+CONF_STORE_SAVE_DELAY = "store_save_delay"
+DEFAULT_STORE_SAVE_DELAY = 30.0  # seconds
+CONF_BACKFILL_HISTORY = "backfill_history"
+DEFAULT_BACKFILL_HISTORY = False
+BACKFILL_MAX_AGE = 86400.0  # seconds, older downtime is left to the gap policy
+
+# Storage
+STORAGE_KEY = f"{DOMAIN}.energy"
+STORAGE_VERSION = 1
 
 # UniFi integration constants
 UNIFI_DOMAIN = "unifi"
 
+# Events
+EVENT_RESET_ENERGY = f"{DOMAIN}_reset_energy"
+
+# Services
+SERVICE_RECOMPUTE = "recompute"
+ATTR_START_TIME = "start_time"
+ATTR_END_TIME = "end_time"
+
 # Entity attributes
 ATTR_DEVICE_ID = "device_id"
 ATTR_PORT_IDX = "port_idx"
+ATTR_POE_ENTITY_ID = "poe_entity_id"
+ATTR_INTEGRATION_METHOD = "integration_method"
+ATTR_LAST_UPDATE = "last_update"
+ATTR_LAST_POWER_WATTS = "last_power_watts"
+ATTR_INTEGRATION_ERROR_KWH = "integration_error_kwh"
+ATTR_OUTAGE_COUNT = "outage_count"
+ATTR_OUTAGE_SECONDS = "outage_seconds"
+
+# Attribute policies
+CONF_ATTRIBUTE_POLICY = "attribute_policy"
+ATTRIBUTE_POLICY_ALL = "all"
+ATTRIBUTE_POLICY_STATIC = "static"
+DEFAULT_ATTRIBUTE_POLICY = ATTRIBUTE_POLICY_ALL
 
 # Sensor types
 SENSOR_TYPE_POE_POWER = "poe_power"
@@ -0,0 +1,58 @@
+"""Diagnostics support for UniFi Energy Helper."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data.get(DOMAIN, {})
+    write_scheduler = data.get("write_scheduler")
+    catch_up_scheduler = data.get("catch_up_scheduler")
+    statistics_exporter = data.get("statistics_exporter")
+    accumulator = data.get("accumulator")
+
+    return {
+        "options": dict(entry.options),
+        "update_mode": data.get("update_mode"),
+        "tracked_power_entities": len(data.get("tracked_poe_entities", ())),
+        "energy_sensors": len(data.get("sensors_by_entity_id", {})),
+        "accumulator_slots": len(accumulator) if accumulator else 0,
+        "integration_method": accumulator.method if accumulator else None,
+        "integration_error_kwh": round(sum(accumulator.error_kwh), 6)
+        if accumulator
+        else 0,
+        "gap_policy": accumulator.gap_policy if accumulator else None,
+        "outage_count": sum(accumulator.outage_count) if accumulator else 0,
+        "outage_seconds": round(sum(accumulator.outage_seconds), 1)
+        if accumulator
+        else 0,
+        "node_totals": {
+            node_key: {
+                "energy_kwh": round(accumulator.node_total_kwh[node], 6),
+                "power_watts": round(accumulator.node_power_watts[node], 2),
+            }
+            for node_key, node in accumulator.nodes.items()
+        }
+        if accumulator
+        else {},
+        "write_scheduler": write_scheduler.metrics if write_scheduler else None,
+        "catch_up_scheduler": catch_up_scheduler.metrics
+        if catch_up_scheduler
+        else None,
+        "statistics_exporter": statistics_exporter.metrics
+        if statistics_exporter
+        else None,
+        "sensors": {
+            entity_id: sensor.volatile_attributes
+            for entity_id, sensor in data.get("sensors_by_entity_id", {}).items()
+        },
+    }
@@ -0,0 +1,89 @@
+"""Discovery of UniFi PoE port and PDU outlet power entities."""
+
+from __future__ import annotations
+
+import logging
+import re
+
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import UnitOfPower
+from homeassistant.core import HomeAssistant, State, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from .const import UNIFI_DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Matches PoE port and PDU outlet power sensors by entity_id or unique_id
+_POWER_KEYWORDS = re.compile("port|poe|outlet|pdu", re.IGNORECASE)
+
+
+def is_unifi_power_entity(entry: er.RegistryEntry) -> bool:
+    """Check if an entity registry entry is a UniFi PoE port or PDU outlet power sensor."""
+    if not (
+        entry.platform == UNIFI_DOMAIN
+        and entry.domain == "sensor"
+        and entry.device_id
+        and entry.original_device_class == SensorDeviceClass.POWER
+        and entry.unit_of_measurement == UnitOfPower.WATT
+        and entry.disabled_by is None
+    ):
+        return False
+
+    # Check if this is a PoE port power sensor or PDU outlet power sensor
+    return bool(
+        _POWER_KEYWORDS.search(entry.entity_id)
+        or (entry.unique_id and _POWER_KEYWORDS.search(entry.unique_id))
+    )
+
+
+def power_from_state(state: State | None) -> float | None:
+    """Return the power in W of a power entity state, None if not valid."""
+    if not state or state.state in ("unknown", "unavailable"):
+        return None
+
+    try:
+        return float(state.state)
+    except (ValueError, TypeError):
+        _LOGGER.debug(
+            "Invalid power reading from %s: %s", state.entity_id, state.state
+        )
+        return None
+
+
+@callback
+def async_get_unifi_power_entities(hass: HomeAssistant) -> list[er.RegistryEntry]:
+    """Return all UniFi PoE port and PDU outlet power entities.
+
+    Only the registry entries of UniFi config entries are inspected, using the
+    registry's config entry index, rather than scanning the whole registry.
+    """
+    entity_registry = er.async_get(hass)
+    return [
+        entry
+        for unifi_entry in hass.config_entries.async_entries(UNIFI_DOMAIN)
+        for entry in er.async_entries_for_config_entry(
+            entity_registry, unifi_entry.entry_id
+        )
+        if is_unifi_power_entity(entry)
+    ]
+
+
+@callback
+def async_get_unifi_device_info(
+    hass: HomeAssistant, device_id: str | None
+) -> DeviceInfo | None:
+    """Return device info that links an entity to an existing UniFi device.
+
+    Only the device's identifiers and connections are returned, so Home
+    Assistant links the entity to the device while registering it instead of
+    describing (or overwriting) the device.
+    """
+    device = dr.async_get(hass).async_get(device_id) if device_id else None
+    if device is None:
+        return None
+    return DeviceInfo(
+        identifiers=set(device.identifiers),
+        connections=set(device.connections),
+    )
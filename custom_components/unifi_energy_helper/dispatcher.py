@@ -0,0 +1,216 @@
+"""Shared event dispatchers for UniFi Energy Helper."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+import logging
+from typing import Any
+
+from homeassistant.const import EVENT_STATE_CHANGED, EVENT_STATE_REPORTED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UniFiEnergyRegistryDispatcher:
+    """Route entity registry updates to the entities interested in them.
+
+    A single EVENT_ENTITY_REGISTRY_UPDATED listener is registered for the whole
+    integration. Entities subscribe for the entity_id they care about, so each
+    registry event costs one dict lookup instead of one callback per entity.
+    Subscriptions follow entity_id renames.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self._listeners: dict[str, list[Callable[[Event], None]]] = {}
+        # Current entity_id of every subscribed action
+        self._entity_ids: dict[Callable[[Event], None], str] = {}
+        self._global_listeners: list[Callable[[Event], None]] = []
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start listening for entity registry updates."""
+        if self._unsub is None:
+            self._unsub = self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED,
+                self._async_handle_registry_updated,
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening and drop all subscriptions."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+        self._listeners.clear()
+        self._entity_ids.clear()
+        self._global_listeners.clear()
+
+    @callback
+    def async_listen(
+        self, entity_id: str, action: Callable[[Event], None]
+    ) -> CALLBACK_TYPE:
+        """Call action for registry updates of a single entity_id.
+
+        Each action can only be subscribed once.
+        """
+        self._listeners.setdefault(entity_id, []).append(action)
+        self._entity_ids[action] = entity_id
+
+        @callback
+        def _async_remove() -> None:
+            if (current := self._entity_ids.pop(action, None)) is None:
+                return
+            listeners = self._listeners[current]
+            listeners.remove(action)
+            if not listeners:
+                del self._listeners[current]
+
+        return _async_remove
+
+    @callback
+    def async_listen_all(self, action: Callable[[Event], None]) -> CALLBACK_TYPE:
+        """Call action for every registry update (e.g. new entity discovery)."""
+        self._global_listeners.append(action)
+
+        @callback
+        def _async_remove() -> None:
+            if action in self._global_listeners:
+                self._global_listeners.remove(action)
+
+        return _async_remove
+
+    @callback
+    def _async_handle_registry_updated(self, event: Event) -> None:
+        """Dispatch a registry event to its subscribers."""
+        # Copy so subscribers can unsubscribe while being called
+        for action in list(self._global_listeners):
+            action(event)
+
+        entity_id = event.data.get("entity_id")
+        # Move the subscribers of a renamed entity to its new entity_id
+        if (
+            event.data.get("action") == "update"
+            and (old_entity_id := event.data.get("old_entity_id")) in self._listeners
+        ):
+            moved = self._listeners.pop(old_entity_id)
+            self._listeners.setdefault(entity_id, []).extend(moved)
+            for action in moved:
+                self._entity_ids[action] = entity_id
+
+        listeners = self._listeners.get(entity_id)
+        if not listeners:
+            return
+
+        # Copy so subscribers can unsubscribe while being called
+        for action in list(listeners):
+            action(event)
+
+
+class UniFiEnergyStateDispatcher:
+    """Route state changes and reports of tracked power entities to their sensor.
+
+    A single EVENT_STATE_CHANGED listener is registered for all power
+    entities, with an event filter on the tracked entity_ids, instead of one
+    state change tracker per sensor. EVENT_STATE_REPORTED - an unchanged state
+    written again, e.g. a port drawing steady power - is routed the same way
+    to subscribers that asked for reports. Each entity_id has one subscriber,
+    and the bus listeners are only registered while there are subscribers.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self._listeners: dict[str, Callable[[Event], None]] = {}
+        self._report_listeners: dict[str, Callable[[Event], None]] = {}
+        self._unsub: CALLBACK_TYPE | None = None
+        self._unsub_reported: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening and drop all subscriptions."""
+        self._listeners.clear()
+        self._report_listeners.clear()
+        self._async_update_bus_listeners()
+
+    @callback
+    def async_listen(
+        self,
+        entity_id: str,
+        action: Callable[[Event], None],
+        report_action: Callable[[Event], None] | None = None,
+    ) -> CALLBACK_TYPE:
+        """Call action for state changes of entity_id, replacing its subscriber.
+
+        If report_action is given, it is called when the unchanged state of
+        entity_id is reported again.
+        """
+        self._listeners[entity_id] = action
+        if report_action is not None:
+            self._report_listeners[entity_id] = report_action
+        else:
+            self._report_listeners.pop(entity_id, None)
+        self._async_update_bus_listeners()
+
+        @callback
+        def _async_remove() -> None:
+            if self._listeners.get(entity_id) is not action:
+                return
+            del self._listeners[entity_id]
+            self._report_listeners.pop(entity_id, None)
+            self._async_update_bus_listeners()
+
+        return _async_remove
+
+    @callback
+    def _async_update_bus_listeners(self) -> None:
+        """Register the bus listeners that have subscribers, drop the others."""
+        if self._listeners and self._unsub is None:
+            self._unsub = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED,
+                self._async_handle_state_changed,
+                event_filter=self._async_filter_state_changed,
+            )
+        elif not self._listeners and self._unsub:
+            self._unsub()
+            self._unsub = None
+
+        # Home Assistant only accepts state_reported listeners with a filter
+        if self._report_listeners and self._unsub_reported is None:
+            self._unsub_reported = self.hass.bus.async_listen(
+                EVENT_STATE_REPORTED,
+                self._async_handle_state_reported,
+                event_filter=self._async_filter_state_reported,
+            )
+        elif not self._report_listeners and self._unsub_reported:
+            self._unsub_reported()
+            self._unsub_reported = None
+
+    @callback
+    def _async_filter_state_changed(self, event_data: Mapping[str, Any]) -> bool:
+        """Only let state changes of tracked entities through."""
+        return event_data["entity_id"] in self._listeners
+
+    @callback
+    def _async_filter_state_reported(self, event_data: Mapping[str, Any]) -> bool:
+        """Only let state reports of tracked entities through."""
+        return event_data["entity_id"] in self._report_listeners
+
+    @callback
+    def _async_handle_state_changed(self, event: Event) -> None:
+        """Dispatch a state change to the entity's subscriber."""
+        if action := self._listeners.get(event.data["entity_id"]):
+            action(event)
+
+    @callback
+    def _async_handle_state_reported(self, event: Event) -> None:
+        """Dispatch a state report to the entity's subscriber."""
+        # State changes may be delivered to state_reported listeners as well
+        if event.event_type != EVENT_STATE_REPORTED:
+            return
+        if action := self._report_listeners.get(event.data["entity_id"]):
+            action(event)
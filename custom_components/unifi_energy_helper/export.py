@@ -0,0 +1,160 @@
+"""Hourly import of port energy as external statistics."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import datetime
+import logging
+import time
+from typing import Any
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant, callback, split_entity_id
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class UniFiEnergyStatisticsExporter:
+    """Import the hourly energy of every port as external statistics.
+
+    In statistics-only mode the port sensors have no state class, so the
+    recorder neither compiles statistics for them nor needs their state
+    writes. At the end of every hour the totals of all ports are taken in one
+    pass and each is imported as one row with async_add_external_statistics.
+    The sum continues from the last imported row, read once per statistic from
+    the database; a total below the last imported state counts as a reset.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the exporter."""
+        self.hass = hass
+        # Start timestamp, state and sum of the last row, by statistic_id
+        self._last: dict[str, tuple[float, float, float]] = {}
+
+        # Metrics, exposed through diagnostics
+        self._export_count = 0
+        self._row_count = 0
+        self._last_export_rows = 0
+        self._last_export_duration = 0.0
+
+    @staticmethod
+    def statistic_id(entity_id: str) -> str:
+        """Return the external statistic_id of an energy sensor."""
+        return f"{DOMAIN}:{split_entity_id(entity_id)[1]}"
+
+    @callback
+    def async_forget(self, statistic_ids: Iterable[str]) -> None:
+        """Drop cached last rows, so they are read again before the next import."""
+        for statistic_id in statistic_ids:
+            self._last.pop(statistic_id, None)
+
+    @callback
+    def async_export(
+        self, hour_start: datetime, totals: Iterable[tuple[str, str, float]]
+    ) -> None:
+        """Import the hour starting at hour_start for (entity_id, name, kWh) totals.
+
+        The totals are taken by the caller at the end of the hour; the import
+        itself runs in the background.
+        """
+        if "recorder" not in self.hass.config.components:
+            _LOGGER.warning("Recorder not loaded, skipping the statistics import")
+            return
+        self.hass.async_create_background_task(
+            self._async_import(hour_start, list(totals)),
+            f"{DOMAIN} statistics export",
+        )
+
+    async def _async_import(
+        self, hour_start: datetime, totals: list[tuple[str, str, float]]
+    ) -> None:
+        """Import one row per port, reading unknown last rows first."""
+        started = time.monotonic()
+        statistic_ids = {
+            entity_id: self.statistic_id(entity_id) for entity_id, _, _ in totals
+        }
+        if missing := [
+            statistic_id
+            for statistic_id in statistic_ids.values()
+            if statistic_id not in self._last
+        ]:
+            self._last.update(
+                await get_instance(self.hass).async_add_executor_job(
+                    _last_statistics, self.hass, missing
+                )
+            )
+
+        hour_ts = hour_start.timestamp()
+        rows = 0
+        for entity_id, name, total_kwh in totals:
+            statistic_id = statistic_ids[entity_id]
+            if (last := self._last.get(statistic_id)) is None:
+                # A new statistic starts its sum at 0, like a new sensor
+                new_sum = 0.0
+            else:
+                last_start, last_state, last_sum = last
+                if last_start >= hour_ts:
+                    continue
+                new_sum = last_sum + (
+                    total_kwh - last_state if total_kwh >= last_state else total_kwh
+                )
+            async_add_external_statistics(
+                self.hass,
+                StatisticMetaData(
+                    has_mean=False,
+                    has_sum=True,
+                    name=name,
+                    source=DOMAIN,
+                    statistic_id=statistic_id,
+                    unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+                ),
+                [StatisticData(start=hour_start, state=total_kwh, sum=new_sum)],
+            )
+            self._last[statistic_id] = (hour_ts, total_kwh, new_sum)
+            rows += 1
+
+        self._export_count += 1
+        self._row_count += rows
+        self._last_export_rows = rows
+        self._last_export_duration = time.monotonic() - started
+        _LOGGER.debug("Imported %d hourly energy statistics for %s", rows, hour_start)
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return exporter metrics for diagnostics."""
+        return {
+            "statistics": len(self._last),
+            "export_count": self._export_count,
+            "row_count": self._row_count,
+            "last_export_rows": self._last_export_rows,
+            "last_export_duration_ms": round(self._last_export_duration * 1000, 3),
+        }
+
+
+def _last_statistics(
+    hass: HomeAssistant, statistic_ids: list[str]
+) -> dict[str, tuple[float, float, float]]:
+    """Return the start, state and sum of the last row of each statistic.
+
+    Runs blocking database I/O, use the recorder's executor.
+    """
+    last: dict[str, tuple[float, float, float]] = {}
+    for statistic_id in statistic_ids:
+        if rows := get_last_statistics(
+            hass, 1, statistic_id, False, {"state", "sum"}
+        ).get(statistic_id):
+            row = rows[0]
+            last[statistic_id] = (
+                row["start"],
+                row.get("state") or 0.0,
+                row.get("sum") or 0.0,
+            )
+    return last
@@ -0,0 +1,292 @@
+"""Recompute of long-term energy statistics from recorder history."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import logging
+
+import voluptuous as vol
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.db_schema import Statistics
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    async_import_statistics,
+)
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.const import ATTR_ENTITY_ID, UnitOfEnergy
+from homeassistant.core import HomeAssistant, ServiceCall, State, callback
+from homeassistant.exceptions import ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .accumulator import EnergyAccumulator
+from .backfill import get_power_history, get_recording_stops, mark_stop
+from .const import ATTR_END_TIME, ATTR_START_TIME, DOMAIN, SERVICE_RECOMPUTE
+from .discovery import power_from_state
+
+_LOGGER = logging.getLogger(__name__)
+
+RECOMPUTE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_ids,
+        vol.Required(ATTR_START_TIME): cv.datetime,
+        vol.Optional(ATTR_END_TIME): cv.datetime,
+    }
+)
+
+# History is read and integrated this much at a time, so a month of samples
+# of a whole fleet is never held in memory at once
+_CHUNK = timedelta(hours=6)
+_HOUR = 3600.0
+
+
+@callback
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def _async_handle_recompute(call: ServiceCall) -> None:
+        """Handle the recompute service call."""
+        await async_recompute(
+            hass,
+            call.data[ATTR_ENTITY_ID],
+            call.data[ATTR_START_TIME],
+            call.data.get(ATTR_END_TIME),
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_RECOMPUTE, _async_handle_recompute, schema=RECOMPUTE_SCHEMA
+    )
+
+
+async def async_recompute(
+    hass: HomeAssistant,
+    entity_ids: list[str],
+    start_time: datetime,
+    end_time: datetime | None = None,
+) -> None:
+    """Rewrite the hourly statistics of energy sensors from power history.
+
+    The recorded power states in the period are integrated with a private
+    accumulator using the configured integration method and gap policy, which
+    like the history backfill also covers the times Home Assistant was
+    stopped. The hourly state and sum rows are imported over the existing
+    ones, continuing from the last row before the period. Sums after the
+    period are shifted by the difference, so they stay continuous.
+    The sensors' current totals are not changed. In statistics-only mode the
+    external statistics of the sensors are recomputed instead.
+    """
+    if "recorder" not in hass.config.components:
+        raise ServiceValidationError("The recorder is required to recompute energy")
+
+    sensors_by_entity_id = hass.data.get(DOMAIN, {}).get("sensors_by_entity_id", {})
+    exporter = hass.data[DOMAIN].get("statistics_exporter")
+    power_entity_ids: dict[str, str] = {}
+    metadata: dict[str, StatisticMetaData] = {}
+    for entity_id in entity_ids:
+        if (sensor := sensors_by_entity_id.get(entity_id)) is None:
+            raise ServiceValidationError(
+                f"{entity_id} is not a UniFi Energy Helper energy sensor"
+            )
+        power_entity_ids[entity_id] = sensor._poe_entity_id  # noqa: SLF001
+        metadata[entity_id] = (
+            _statistic_metadata(entity_id, "recorder")
+            if exporter is None
+            else _statistic_metadata(
+                exporter.statistic_id(entity_id),
+                DOMAIN,
+                sensor._statistic_name,  # noqa: SLF001
+            )
+        )
+
+    # Only whole hours are recomputed
+    start = _floor_hour(dt_util.as_utc(start_time))
+    end = _floor_hour(dt_util.as_utc(end_time or dt_util.utcnow()))
+    if end <= start:
+        raise ServiceValidationError("The period must contain a whole hour")
+
+    live: EnergyAccumulator = hass.data[DOMAIN]["accumulator"]
+    accumulator = EnergyAccumulator(live.method, live.gap_policy, live.gap_max_age)
+    slots = {entity_id: accumulator.allocate(entity_id) for entity_id in entity_ids}
+
+    recorder = get_instance(hass)
+    statistic_ids = {meta["statistic_id"] for meta in metadata.values()}
+    before_start = await recorder.async_add_executor_job(
+        _last_statistics_before, hass, start, statistic_ids
+    )
+    before_end = await recorder.async_add_executor_job(
+        _last_statistics_before, hass, end, statistic_ids
+    )
+    end_ts = end.timestamp()
+    stops = [
+        stop
+        for stop in await recorder.async_add_executor_job(
+            get_recording_stops, hass, start
+        )
+        if stop[0] < end_ts
+    ]
+
+    import_statistics = (
+        async_import_statistics if exporter is None else async_add_external_statistics
+    )
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + _CHUNK, end)
+        chunk_stops = [
+            stop
+            for stop in stops
+            if chunk_start.timestamp() < stop[0] <= chunk_end.timestamp()
+        ]
+        recorded = await recorder.async_add_executor_job(
+            get_power_history,
+            hass,
+            chunk_start,
+            chunk_end,
+            list(power_entity_ids.values()),
+            chunk_start == start,
+        )
+
+        for entity_id, power_entity_id in power_entity_ids.items():
+            statistic_id = metadata[entity_id]["statistic_id"]
+            base_state, base_sum = before_start.get(statistic_id, (0.0, 0.0))
+            import_statistics(
+                hass,
+                metadata[entity_id],
+                _integrate_hours(
+                    accumulator,
+                    slots[entity_id],
+                    recorded.get(power_entity_id, []),
+                    chunk_stops,
+                    chunk_start.timestamp(),
+                    chunk_end.timestamp(),
+                    base_state,
+                    base_sum,
+                ),
+            )
+        chunk_start = chunk_end
+
+    for entity_id, slot in slots.items():
+        statistic_id = metadata[entity_id]["statistic_id"]
+        total_kwh = accumulator.total_kwh[slot]
+        _LOGGER.info(
+            "Recomputed %s from %s to %s: %.3f kWh",
+            entity_id,
+            start,
+            end,
+            total_kwh,
+        )
+        # Rows after the period continued from the last row before its end
+        new_sum = before_start.get(statistic_id, (0.0, 0.0))[1] + total_kwh
+        old_sum = before_end.get(statistic_id, (0.0, 0.0))[1]
+        if new_sum != old_sum:
+            recorder.async_adjust_statistics(
+                statistic_id, end, new_sum - old_sum, UnitOfEnergy.KILO_WATT_HOUR
+            )
+
+    # The exporter continues from sums that were just shifted
+    if exporter is not None:
+        exporter.async_forget(statistic_ids)
+
+
+def _integrate_hours(
+    accumulator: EnergyAccumulator,
+    slot: int,
+    states: list[State | dict],
+    stops: list[tuple[float, bool]],
+    start: float,
+    end: float,
+    base_state: float,
+    base_sum: float,
+) -> list[StatisticData]:
+    """Integrate the states of a chunk and return a row per hour ending in it.
+
+    Each stop of Home Assistant in the chunk starts an outage, closed by the
+    next state with the gap policy.
+    """
+    rows: list[StatisticData] = []
+    hour_end = start + _HOUR
+
+    def _close_hours(until: float) -> None:
+        nonlocal hour_end
+        while hour_end <= until:
+            accumulator.advance(slot, hour_end)
+            total_kwh = accumulator.total_kwh[slot]
+            rows.append(
+                StatisticData(
+                    start=dt_util.utc_from_timestamp(hour_end - _HOUR),
+                    state=base_state + total_kwh,
+                    sum=base_sum + total_kwh,
+                )
+            )
+            hour_end += _HOUR
+
+    pending_stops = iter(stops)
+    stop = next(pending_stops, None)
+    for state in states:
+        if not isinstance(state, State):
+            continue
+        # The state at the start of the period may be older
+        timestamp = max(state.last_updated_timestamp, start)
+        while stop is not None and stop[0] <= timestamp:
+            _close_hours(stop[0])
+            mark_stop(accumulator, slot, stop)
+            stop = next(pending_stops, None)
+        _close_hours(timestamp)
+        if (power_watts := power_from_state(state)) is None:
+            accumulator.mark_outage(slot, timestamp)
+        else:
+            accumulator.integrate(slot, timestamp, power_watts)
+    while stop is not None:
+        _close_hours(stop[0])
+        mark_stop(accumulator, slot, stop)
+        stop = next(pending_stops, None)
+    _close_hours(end)
+    return rows
+
+
+def _last_statistics_before(
+    hass: HomeAssistant, before: datetime, statistic_ids: set[str]
+) -> dict[str, tuple[float, float]]:
+    """Return the state and sum of the last hourly row before a time.
+
+    The row may be any number of hours earlier, e.g. when Home Assistant was
+    down. Runs blocking database I/O, use the recorder's executor.
+    """
+    before_ts = before.timestamp()
+    last: dict[str, tuple[float, float]] = {}
+    with session_scope(hass=hass, read_only=True) as session:
+        metadata = get_instance(hass).statistics_meta_manager.get_many(
+            session, statistic_ids=statistic_ids
+        )
+        for statistic_id, (metadata_id, _) in metadata.items():
+            row = (
+                session.query(Statistics.state, Statistics.sum)
+                .filter(Statistics.metadata_id == metadata_id)
+                .filter(Statistics.start_ts < before_ts)
+                .order_by(Statistics.start_ts.desc())
+                .limit(1)
+                .one_or_none()
+            )
+            if row is not None:
+                last[statistic_id] = (row.state or 0.0, row.sum or 0.0)
+    return last
+
+
+def _statistic_metadata(
+    statistic_id: str, source: str, name: str | None = None
+) -> StatisticMetaData:
+    """Return the metadata of an energy sensor's long-term statistics."""
+    return StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=name,
+        source=source,
+        statistic_id=statistic_id,
+        unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+    )
+
+
+def _floor_hour(value: datetime) -> datetime:
+    """Return the start of the hour of a time."""
+    return value.replace(minute=0, second=0, microsecond=0)
@@ -0,0 +1,141 @@
+"""Area and site rollups for UniFi Energy Helper."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import area_registry as ar, device_registry as dr
+
+from .accumulator import EnergyAccumulator
+from .const import UNIFI_DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Device registry changes that move a device in the rollup tree
+_TOPOLOGY_CHANGES = ("area_id", "config_entries")
+
+
+class UniFiEnergyRollupTree:
+    """Place device nodes of the accumulator in a device → area → site tree.
+
+    A UniFi site is a config entry of the UniFi integration. Devices with an
+    area roll up into an area node below their site, devices without an area
+    directly into the site node. The parents are only recomputed for devices
+    whose area or config entries change in the device registry; the totals
+    themselves are updated by the accumulator with every port sample.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        accumulator: EnergyAccumulator,
+        new_node_action: Callable[[str, str], None],
+        changed_nodes_action: Callable[[Iterable[int]], None],
+    ) -> None:
+        """Initialize the rollup tree.
+
+        Args:
+            hass: Home Assistant instance
+            accumulator: The shared accumulator holding the nodes
+            new_node_action: Called with the key and name of new area and
+                site nodes
+            changed_nodes_action: Called with the nodes whose power changed
+                because a device moved
+        """
+        self.hass = hass
+        self._accumulator = accumulator
+        self._new_node_action = new_node_action
+        self._changed_nodes_action = changed_nodes_action
+        self._devices: set[str] = set()
+        self._known_nodes: set[str] = set()
+        self._unsub: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Start following device registry topology changes."""
+        if self._unsub is None:
+            self._unsub = self.hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED,
+                self._async_handle_device_registry_updated,
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following device registry changes."""
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def async_add_device(self, device_id: str) -> None:
+        """Add a UniFi device to the tree."""
+        if device_id in self._devices:
+            return
+        self._devices.add(device_id)
+        self._async_place_device(device_id)
+
+    @callback
+    def _async_handle_device_registry_updated(self, event: Event) -> None:
+        """Move a tracked device when its area or config entries change."""
+        if event.data.get("action") != "update":
+            return
+        device_id = event.data.get("device_id")
+        if device_id not in self._devices:
+            return
+        changes = event.data.get("changes", {})
+        if any(change in changes for change in _TOPOLOGY_CHANGES):
+            _LOGGER.debug("Registry topology of device %s changed", device_id)
+            self._async_place_device(device_id)
+
+    @callback
+    def _async_place_device(self, device_id: str) -> None:
+        """Move a device node under its current area or site node."""
+        device = dr.async_get(self.hass).async_get(device_id)
+        if device is None:
+            return
+
+        parent = self._async_parent_node(device)
+        accumulator = self._accumulator
+        node = accumulator.allocate_node(device_id)
+        old_lineage = list(accumulator.node_lineage(node))
+        accumulator.set_parent(node, parent)
+
+        # Both the old and the new ancestors had their power changed
+        self._changed_nodes_action(
+            {*old_lineage, *accumulator.node_lineage(node)}
+        )
+
+    @callback
+    def _async_parent_node(self, device: dr.DeviceEntry) -> int:
+        """Return the node a device rolls up into, -1 if it has no site."""
+        site_entries = sorted(
+            entry.entry_id
+            for entry in self.hass.config_entries.async_entries(UNIFI_DOMAIN)
+            if entry.entry_id in device.config_entries
+        )
+        if not site_entries:
+            return -1
+
+        site_entry = self.hass.config_entries.async_get_entry(site_entries[0])
+        site_key = f"site_{site_entry.entry_id}"
+        site_node = self._async_node(site_key, site_entry.title, -1)
+        if device.area_id is None:
+            return site_node
+
+        area = ar.async_get(self.hass).async_get_area(device.area_id)
+        return self._async_node(
+            f"{site_key}_area_{device.area_id}",
+            area.name if area else device.area_id,
+            site_node,
+        )
+
+    @callback
+    def _async_node(self, key: str, name: str, parent: int) -> int:
+        """Return the node for key, announcing it the first time."""
+        node = self._accumulator.allocate_node(key, parent)
+        if key not in self._known_nodes:
+            self._known_nodes.add(key)
+            self._new_node_action(key, name)
+        return node
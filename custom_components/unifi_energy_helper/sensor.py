@@ -2,55 +2,581 @@
 
 from __future__ import annotations
 
-from datetime import datetime
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 import logging
+import math
+import time
 from typing import Any
 
 from homeassistant.components.sensor import (
     RestoreSensor,
     SensorDeviceClass,
+    SensorExtraStoredData,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import UnitOfEnergy, UnitOfPower
-from homeassistant.core import Event, HomeAssistant, callback
-from homeassistant.helpers import entity_registry as er
+from homeassistant.const import (
+    ATTR_AREA_ID,
+    ATTR_DEVICE_ID,
+    ATTR_ENTITY_ID,
+    UnitOfEnergy,
+    UnitOfPower,
+)
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_time_interval,
+    async_track_utc_time_change,
+)
+from homeassistant.helpers.restore_state import (
+    StoredState,
+    async_get as async_get_restore_state,
+)
 from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, SECONDS_TO_HOURS, UNIFI_DOMAIN, WATTS_TO_KILOWATTS
+from .const import (
+    ATTR_INTEGRATION_ERROR_KWH,
+    ATTR_INTEGRATION_METHOD,
+    ATTR_LAST_POWER_WATTS,
+    ATTR_LAST_UPDATE,
+    ATTR_OUTAGE_COUNT,
+    ATTR_OUTAGE_SECONDS,
+    ATTR_POE_ENTITY_ID,
+    ATTRIBUTE_POLICY_ALL,
+    BOUNDARY_SPLIT_5MINUTE,
+    BOUNDARY_SPLIT_HOUR,
+    BOUNDARY_SPLIT_OFF,
+    CONF_ATTRIBUTE_POLICY,
+    CONF_BACKFILL_HISTORY,
+    CONF_BOUNDARY_SPLIT,
+    CONF_DEVICE_AGGREGATES,
+    CONF_GAP_MAX_AGE,
+    CONF_GAP_POLICY,
+    CONF_INTEGRATION_METHOD,
+    CONF_PUBLISH_HEARTBEAT,
+    CONF_PUBLISH_MAX_AGE,
+    CONF_PUBLISH_MIN_DELTA,
+    CONF_PUBLISH_MIN_INTERVAL,
+    CONF_PUBLISH_REPORT_INTERVAL,
+    CONF_ROLLUP_AGGREGATES,
+    CONF_SCAN_INTERVAL,
+    CONF_STATISTICS_ONLY,
+    CONF_STORE_SAVE_DELAY,
+    CONF_UPDATE_MODE,
+    CONF_WRITE_DEBOUNCE,
+    DEFAULT_ATTRIBUTE_POLICY,
+    DEFAULT_BACKFILL_HISTORY,
+    DEFAULT_BOUNDARY_SPLIT,
+    DEFAULT_DEVICE_AGGREGATES,
+    DEFAULT_GAP_MAX_AGE,
+    DEFAULT_GAP_POLICY,
+    DEFAULT_INTEGRATION_METHOD,
+    DEFAULT_PUBLISH_HEARTBEAT,
+    DEFAULT_PUBLISH_MAX_AGE,
+    DEFAULT_PUBLISH_MIN_DELTA,
+    DEFAULT_PUBLISH_MIN_INTERVAL,
+    DEFAULT_PUBLISH_REPORT_INTERVAL,
+    DEFAULT_ROLLUP_AGGREGATES,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_STATISTICS_ONLY,
+    DEFAULT_STORE_SAVE_DELAY,
+    DEFAULT_UPDATE_MODE,
+    DEFAULT_WRITE_DEBOUNCE,
+    DOMAIN,
+    EVENT_RESET_ENERGY,
+    UPDATE_MODE_EVENT,
+    UPDATE_MODE_INTERVAL,
+)
+from .accumulator import EnergyAccumulator
+from .backfill import PowerHistory, async_get_power_history, backfill_slot
+from .discovery import (
+    async_get_unifi_device_info,
+    async_get_unifi_power_entities,
+    is_unifi_power_entity,
+    power_from_state,
+)
+from .export import UniFiEnergyStatisticsExporter
+from .rollup import UniFiEnergyRollupTree
+from .store import UniFiEnergyStore
 
 _LOGGER = logging.getLogger(__name__)
 
+# Resolution of the catch-up timer wheel (seconds)
+_CATCH_UP_TICK = 60.0
 
-def _is_unifi_power_entity(entry: er.RegistryEntry) -> bool:
-    """Check if an entity registry entry is a UniFi PoE port or PDU outlet power sensor."""
-    if not (
-        entry.platform == UNIFI_DOMAIN
-        and entry.entity_id.startswith("sensor.")
-        and entry.device_id
-        and entry.original_device_class == SensorDeviceClass.POWER
-        and entry.unit_of_measurement == UnitOfPower.WATT
-        and entry.disabled_by is None
-    ):
-        return False
-
-    # Check if this is a PoE port power sensor or PDU outlet power sensor
-    entity_lower = entry.entity_id.lower()
-    unique_lower = entry.unique_id.lower() if entry.unique_id else ""
-    
-    return bool(
-        "port" in entity_lower
-        or "poe" in entity_lower
-        or "outlet" in entity_lower
-        or "pdu" in entity_lower
-        or "port" in unique_lower
-        or "poe" in unique_lower
-        or "outlet" in unique_lower
-        or "pdu" in unique_lower
-    )
+
+def _total_from_restore_state(stored: StoredState | None) -> float | None:
+    """Return the restored total in kWh of an energy sensor, None if not valid."""
+    if stored is None or stored.extra_data is None:
+        return None
+
+    sensor_data = SensorExtraStoredData.from_dict(stored.extra_data.as_dict())
+    if sensor_data is None or sensor_data.native_value is None:
+        return None
+
+    try:
+        return float(sensor_data.native_value)  # type: ignore[arg-type]
+    except (ValueError, TypeError):
+        _LOGGER.warning(
+            "Could not restore energy state for %s, starting from 0",
+            stored.state.entity_id,
+        )
+        return None
+
+
+@callback
+def _async_seed_sensors(
+    hass: HomeAssistant,
+    sensors: list[UniFiEnergyAccumulationSensor],
+    power_history: Mapping[str, PowerHistory] | None = None,
+) -> None:
+    """Restore the totals and current power of new sensors in one pass.
+
+    Totals come from the energy store, falling back to the restore state for
+    sensors that are not in the store yet. This runs before the sensors are
+    added, so adding them does not await a restore lookup per entity.
+
+    Recorded power since the stored reading of a sensor, if given, is
+    integrated before the current power.
+    """
+    accumulator: EnergyAccumulator = hass.data[DOMAIN]["accumulator"]
+    energy_store: UniFiEnergyStore = hass.data[DOMAIN]["energy_store"]
+    entity_registry = er.async_get(hass)
+    last_states = async_get_restore_state(hass).last_states
+    states = hass.states
+    now = time.time()
+    restored = 0
+    backfilled = 0
+
+    for sensor in sensors:
+        slot = sensor._slot  # noqa: SLF001
+        poe_entity_id = sensor._poe_entity_id  # noqa: SLF001
+
+        if energy_store.async_restore_slot(poe_entity_id, slot):
+            restored += 1
+        elif (
+            entity_id := entity_registry.async_get_entity_id(
+                "sensor", DOMAIN, sensor.unique_id
+            )
+        ) and (
+            total_kwh := _total_from_restore_state(last_states.get(entity_id))
+        ) is not None:
+            accumulator.total_kwh[slot] = total_kwh
+            restored += 1
+
+        # The recorded power replaces the gap since the stored reading, where
+        # Home Assistant was recording
+        if power_history and (history := power_history.get(poe_entity_id)):
+            backfill_slot(accumulator, slot, history)
+            backfilled += 1
+
+        # A reading restored from the store is in an outage since we stopped,
+        # so the current power closes the downtime with the gap policy. After
+        # a backfill the last recorded power holds until now
+        power_watts = power_from_state(states.get(poe_entity_id))
+        if power_watts is not None:
+            accumulator.integrate(slot, now, power_watts)
+
+    _LOGGER.info("Restored energy state for %d of %d sensors", restored, len(sensors))
+    if power_history is not None:
+        _LOGGER.info("Backfilled %d sensors from recorder history", backfilled)
+
+
+def _as_list(value: Any) -> list[str]:
+    """Normalize a single id or a list of ids from event data to a list."""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+@callback
+def _async_resolve_reset_targets(
+    hass: HomeAssistant, event_data: dict[str, Any]
+) -> list[UniFiEnergyAccumulationSensor]:
+    """Resolve the energy sensors targeted by a reset event.
+
+    The event may carry `entity_id`, `device_id` and/or `area_id`, each either a
+    single id or a list of ids. Only the targeted registry entries are looked up,
+    so the work is proportional to the number of targets, not to all sensors.
+    """
+    sensors_by_entity_id: dict[str, UniFiEnergyAccumulationSensor] = hass.data[
+        DOMAIN
+    ]["sensors_by_entity_id"]
+    entity_ids: set[str] = set(_as_list(event_data.get(ATTR_ENTITY_ID)))
+
+    device_ids = _as_list(event_data.get(ATTR_DEVICE_ID))
+    area_ids = _as_list(event_data.get(ATTR_AREA_ID))
+
+    if device_ids or area_ids:
+        entity_registry = er.async_get(hass)
+        device_registry = dr.async_get(hass)
+
+        for area_id in area_ids:
+            # Entities assigned to the area directly
+            entity_ids.update(
+                entry.entity_id
+                for entry in er.async_entries_for_area(entity_registry, area_id)
+            )
+            # Entities inheriting the area from their device
+            for device in dr.async_entries_for_area(device_registry, area_id):
+                entity_ids.update(
+                    entry.entity_id
+                    for entry in er.async_entries_for_device(
+                        entity_registry, device.id
+                    )
+                    if entry.area_id is None
+                )
+
+        for device_id in device_ids:
+            entity_ids.update(
+                entry.entity_id
+                for entry in er.async_entries_for_device(entity_registry, device_id)
+            )
+
+    return [
+        sensors_by_entity_id[entity_id]
+        for entity_id in entity_ids
+        if entity_id in sensors_by_entity_id
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class PublishPolicy:
+    """Decide when an energy sensor publishes its accumulated value.
+
+    Accumulation always happens on every sample; the policy only limits how
+    often the result is written to the state machine (and the recorder).
+    """
+
+    min_delta: float = DEFAULT_PUBLISH_MIN_DELTA
+    min_interval: float = DEFAULT_PUBLISH_MIN_INTERVAL
+    heartbeat: float = DEFAULT_PUBLISH_HEARTBEAT
+    report_interval: float = DEFAULT_PUBLISH_REPORT_INTERVAL
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> PublishPolicy:
+        """Create a policy from config entry options."""
+        return cls(
+            min_delta=options.get(CONF_PUBLISH_MIN_DELTA, DEFAULT_PUBLISH_MIN_DELTA),
+            min_interval=options.get(
+                CONF_PUBLISH_MIN_INTERVAL, DEFAULT_PUBLISH_MIN_INTERVAL
+            ),
+            heartbeat=options.get(CONF_PUBLISH_HEARTBEAT, DEFAULT_PUBLISH_HEARTBEAT),
+            report_interval=options.get(
+                CONF_PUBLISH_REPORT_INTERVAL, DEFAULT_PUBLISH_REPORT_INTERVAL
+            ),
+        )
+
+    def should_publish(
+        self,
+        value: float,
+        published_value: float | None,
+        elapsed: float,
+        reported: bool = False,
+    ) -> bool:
+        """Return True if value should be published.
+
+        Args:
+            value: The value that would be published now
+            published_value: The last published value, None if never published
+            elapsed: Seconds since the last publish
+            reported: The sample was an unchanged power state reported again
+        """
+        if published_value is None:
+            return True
+        # The heartbeat forces a publish even if nothing else would
+        if self.heartbeat and elapsed >= self.heartbeat:
+            return True
+        # Steady ports report on every UniFi poll, only publish those rarely
+        if reported and elapsed < self.report_interval:
+            return False
+        if elapsed < self.min_interval:
+            return False
+        if self.min_delta:
+            return abs(value - published_value) >= self.min_delta
+        return True
+
+
+class UniFiEnergyWriteScheduler:
+    """Coalesce energy sensor state writes made during a UniFi update burst.
+
+    The UniFi integration updates all port power sensors of a device at once.
+    Sensors mark themselves dirty instead of writing immediately, and all dirty
+    sensors are written together once the debounce window has passed (with the
+    default of 0 seconds, on the next event loop iteration).
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        debounce: float,
+        policy: PublishPolicy,
+        heartbeat_scheduler: UniFiEnergyHeartbeatScheduler | None = None,
+    ) -> None:
+        """Initialize the write scheduler."""
+        self.hass = hass
+        self._debounce = debounce
+        self._policy = policy
+        self._heartbeat_scheduler = heartbeat_scheduler
+        # dict instead of set to write sensors in the order they changed
+        self._dirty: dict[UniFiEnergyHelperSensor, None] = {}
+        self._burst_started: float | None = None
+        self._unsub_flush = None
+
+        # Metrics, exposed through diagnostics
+        self._flush_count = 0
+        self._write_count = 0
+        self._suppressed_count = 0
+        self._last_burst_size = 0
+        self._max_burst_size = 0
+        self._last_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+
+    @callback
+    def async_publish(
+        self, sensor: UniFiEnergyHelperSensor, reported: bool = False
+    ) -> None:
+        """Schedule a write for a sensor if the publish policy allows it."""
+        if self._policy.should_publish(
+            sensor.native_value,
+            sensor._published_value,  # noqa: SLF001
+            time.monotonic() - sensor._published_at,  # noqa: SLF001
+            reported,
+        ):
+            self.async_schedule_write(sensor)
+            return
+        self._suppressed_count += 1
+        # Published by the heartbeat timer if no later sample publishes it
+        if self._heartbeat_scheduler is not None:
+            self._heartbeat_scheduler.async_schedule(
+                sensor, sensor._published_at  # noqa: SLF001
+            )
+
+    @callback
+    def async_schedule_write(self, sensor: UniFiEnergyHelperSensor) -> None:
+        """Mark a sensor dirty and schedule a flush if none is pending."""
+        self._dirty[sensor] = None
+        if self._unsub_flush is None:
+            self._burst_started = time.monotonic()
+            self._unsub_flush = async_call_later(
+                self.hass, self._debounce, self._async_flush
+            )
+
+    @callback
+    def async_cancel(self, sensor: UniFiEnergyHelperSensor) -> None:
+        """Drop a pending write, e.g. because the sensor is being removed."""
+        self._dirty.pop(sensor, None)
+        if self._heartbeat_scheduler is not None:
+            self._heartbeat_scheduler.async_remove(sensor)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Write all pending sensors and cancel the scheduled flush."""
+        self._async_flush()
+
+    @callback
+    def _async_flush(self, _now: datetime | None = None) -> None:
+        """Write the state of every dirty sensor."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+
+        dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return
+
+        for sensor in dirty:
+            sensor.async_write_ha_state()
+
+        latency = time.monotonic() - (self._burst_started or time.monotonic())
+        burst_size = len(dirty)
+        self._flush_count += 1
+        self._write_count += burst_size
+        self._last_burst_size = burst_size
+        self._max_burst_size = max(self._max_burst_size, burst_size)
+        self._last_flush_latency = latency
+        self._max_flush_latency = max(self._max_flush_latency, latency)
+        _LOGGER.debug(
+            "Flushed %d energy sensor writes, %.1fms after the burst started",
+            burst_size,
+            latency * 1000,
+        )
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return burst size and flush latency metrics."""
+        return {
+            "debounce_seconds": self._debounce,
+            "publish_policy": {
+                "min_delta_kwh": self._policy.min_delta,
+                "min_interval_seconds": self._policy.min_interval,
+                "heartbeat_seconds": self._policy.heartbeat,
+                "report_interval_seconds": self._policy.report_interval,
+            },
+            "flush_count": self._flush_count,
+            "write_count": self._write_count,
+            "suppressed_count": self._suppressed_count,
+            "pending_writes": len(self._dirty),
+            "last_burst_size": self._last_burst_size,
+            "max_burst_size": self._max_burst_size,
+            "average_burst_size": round(self._write_count / self._flush_count, 2)
+            if self._flush_count
+            else 0,
+            "last_flush_latency_ms": round(self._last_flush_latency * 1000, 3),
+            "max_flush_latency_ms": round(self._max_flush_latency * 1000, 3),
+            "heartbeat": self._heartbeat_scheduler.metrics
+            if self._heartbeat_scheduler
+            else None,
+        }
+
+
+class UniFiEnergyCatchUpScheduler:
+    """Advance and write energy sensors whose last write is too old.
+
+    An idle or steady port gets no new samples, so its total would lag until
+    the next one. Sensors are kept in a timer wheel: buckets of `tick` seconds
+    keyed by when their last write becomes older than the max age. A write
+    moves the sensor to a later bucket in O(1), and one shared timer only
+    visits the buckets that came due, instead of a timer per sensor.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_age: float) -> None:
+        """Initialize the catch-up scheduler."""
+        self.hass = hass
+        self._max_age = max_age
+        self._tick = min(max_age, _CATCH_UP_TICK)
+        self._buckets: dict[int, dict[UniFiEnergyAccumulationSensor, None]] = {}
+        self._bucket_of: dict[UniFiEnergyAccumulationSensor, int] = {}
+        self._unsub_tick = None
+
+        # Metrics, exposed through diagnostics
+        self._catch_up_count = 0
+        self._catch_up_write_count = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Start the shared timer."""
+        if self._unsub_tick is None:
+            self._unsub_tick = async_track_time_interval(
+                self.hass, self._async_tick, timedelta(seconds=self._tick)
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop the shared timer and forget all sensors."""
+        if self._unsub_tick is not None:
+            self._unsub_tick()
+            self._unsub_tick = None
+        self._buckets.clear()
+        self._bucket_of.clear()
+
+    @callback
+    def async_schedule(
+        self, sensor: UniFiEnergyAccumulationSensor, written_at: float
+    ) -> None:
+        """Catch a sensor up once max age passed since written_at (monotonic)."""
+        bucket = math.ceil((written_at + self._max_age) / self._tick)
+        old_bucket = self._bucket_of.get(sensor)
+        if old_bucket == bucket:
+            return
+        if old_bucket is not None:
+            self._async_discard(sensor, old_bucket)
+        self._buckets.setdefault(bucket, {})[sensor] = None
+        self._bucket_of[sensor] = bucket
+
+    @callback
+    def async_remove(self, sensor: UniFiEnergyAccumulationSensor) -> None:
+        """Stop catching a sensor up."""
+        if (bucket := self._bucket_of.pop(sensor, None)) is not None:
+            self._async_discard(sensor, bucket)
+
+    @callback
+    def _async_discard(
+        self, sensor: UniFiEnergyAccumulationSensor, bucket: int
+    ) -> None:
+        """Remove a sensor from a bucket, dropping the bucket once empty."""
+        sensors = self._buckets[bucket]
+        del sensors[sensor]
+        if not sensors:
+            del self._buckets[bucket]
+
+    @callback
+    def _async_tick(self, _now: datetime) -> None:
+        """Catch up the sensors of every bucket that came due."""
+        current = time.monotonic()
+        due = sorted(
+            bucket for bucket in self._buckets if bucket * self._tick <= current
+        )
+        if not due:
+            return
+
+        timestamp = time.time()
+        for bucket in due:
+            for sensor in self._buckets.pop(bucket):
+                del self._bucket_of[sensor]
+                self._async_due(sensor, timestamp, current)
+
+    @callback
+    def _async_due(
+        self, sensor: UniFiEnergyAccumulationSensor, timestamp: float, current: float
+    ) -> None:
+        """Catch up a sensor whose last write became older than the max age."""
+        self._catch_up_count += 1
+        if sensor._async_catch_up(timestamp):  # noqa: SLF001
+            self._catch_up_write_count += 1
+        # Until the write moves it on, or if nothing changed
+        if sensor not in self._bucket_of:
+            self.async_schedule(sensor, current)
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return the number of tracked sensors and catch-ups."""
+        return {
+            "max_age_seconds": self._max_age,
+            "tick_seconds": self._tick,
+            "tracked_sensors": len(self._bucket_of),
+            "pending_buckets": len(self._buckets),
+            "catch_up_count": self._catch_up_count,
+            "catch_up_write_count": self._catch_up_write_count,
+        }
+
+
+class UniFiEnergyHeartbeatScheduler(UniFiEnergyCatchUpScheduler):
+    """Publish values the publish policy suppressed once the heartbeat passed.
+
+    The write scheduler puts a sensor into the timer wheel when it suppresses
+    a publish, keyed by when its last write becomes older than the heartbeat.
+    A later write or suppressed sample moves it, so a quiet sensor publishes
+    the held back value on time even if no further sample arrives. Unlike a
+    catch-up, the total is not advanced.
+    """
+
+    @callback
+    def _async_due(
+        self, sensor: UniFiEnergyHelperSensor, timestamp: float, current: float
+    ) -> None:
+        """Write a sensor if its value changed since its last write."""
+        self._catch_up_count += 1
+        if sensor._async_heartbeat():  # noqa: SLF001
+            self._catch_up_write_count += 1
+
+    @property
+    def metrics(self) -> dict[str, Any]:
+        """Return the number of pending sensors and heartbeat writes."""
+        return {
+            "heartbeat_seconds": self._max_age,
+            "tick_seconds": self._tick,
+            "pending_sensors": len(self._bucket_of),
+            "heartbeat_count": self._catch_up_count,
+            "heartbeat_write_count": self._catch_up_write_count,
+        }
 
 
 async def async_setup_entry(
@@ -60,30 +586,245 @@ async def async_setup_entry(
 ) -> None:
     """Set up UniFi Energy Helper energy sensors from a config entry."""
 
-    entity_registry = er.async_get(hass)
-
     # Store callback and config entry for dynamic entity creation
     if DOMAIN not in hass.data:
         hass.data[DOMAIN] = {}
     hass.data[DOMAIN]["sensor_add_entities"] = async_add_entities
     hass.data[DOMAIN]["config_entry"] = config_entry
     hass.data[DOMAIN]["tracked_poe_entities"] = set()
+    hass.data[DOMAIN]["sensors_by_entity_id"] = {}
+
+    # Suppressed values are published by one shared heartbeat timer
+    policy = PublishPolicy.from_options(config_entry.options)
+    heartbeat_scheduler: UniFiEnergyHeartbeatScheduler | None = None
+    if policy.heartbeat:
+        heartbeat_scheduler = UniFiEnergyHeartbeatScheduler(hass, policy.heartbeat)
+        heartbeat_scheduler.async_start()
+        config_entry.async_on_unload(heartbeat_scheduler.async_stop)
+
+    # Shared writer that coalesces state writes of a UniFi update burst
+    write_scheduler = UniFiEnergyWriteScheduler(
+        hass,
+        config_entry.options.get(CONF_WRITE_DEBOUNCE, DEFAULT_WRITE_DEBOUNCE),
+        policy,
+        heartbeat_scheduler,
+    )
+    hass.data[DOMAIN]["write_scheduler"] = write_scheduler
+    config_entry.async_on_unload(write_scheduler.async_shutdown)
+
+    # Idle and steady sensors are advanced and written by one shared timer
+    hass.data[DOMAIN]["catch_up_scheduler"] = None
+    if max_age := config_entry.options.get(
+        CONF_PUBLISH_MAX_AGE, DEFAULT_PUBLISH_MAX_AGE
+    ):
+        catch_up_scheduler = UniFiEnergyCatchUpScheduler(hass, max_age)
+        catch_up_scheduler.async_start()
+        hass.data[DOMAIN]["catch_up_scheduler"] = catch_up_scheduler
+        config_entry.async_on_unload(catch_up_scheduler.async_stop)
+
+    # Port energy goes to hourly external statistics instead of port states
+    statistics_exporter: UniFiEnergyStatisticsExporter | None = None
+    if config_entry.options.get(CONF_STATISTICS_ONLY, DEFAULT_STATISTICS_ONLY):
+        statistics_exporter = UniFiEnergyStatisticsExporter(hass)
+    hass.data[DOMAIN]["statistics_exporter"] = statistics_exporter
+
+    # All ports accumulate into one shared engine, one slot per power entity
+    accumulator = EnergyAccumulator(
+        config_entry.options.get(CONF_INTEGRATION_METHOD, DEFAULT_INTEGRATION_METHOD),
+        config_entry.options.get(CONF_GAP_POLICY, DEFAULT_GAP_POLICY),
+        config_entry.options.get(CONF_GAP_MAX_AGE, DEFAULT_GAP_MAX_AGE),
+    )
+    hass.data[DOMAIN]["accumulator"] = accumulator
+
+    # Totals of the whole fleet are persisted in one document, read once here
+    energy_store = UniFiEnergyStore(
+        hass,
+        accumulator,
+        config_entry.options.get(CONF_STORE_SAVE_DELAY, DEFAULT_STORE_SAVE_DELAY),
+    )
+    await energy_store.async_load()
+    hass.data[DOMAIN]["energy_store"] = energy_store
+
+    hass.data[DOMAIN]["attribute_policy"] = config_entry.options.get(
+        CONF_ATTRIBUTE_POLICY, DEFAULT_ATTRIBUTE_POLICY
+    )
+
+    # Total sensors by accumulator node, registered once added to hass
+    sensors_by_node: dict[int, list[UniFiAggregateSensor]] = {}
+    hass.data[DOMAIN]["aggregate_sensors"] = sensors_by_node
+    device_aggregates_enabled = config_entry.options.get(
+        CONF_DEVICE_AGGREGATES, DEFAULT_DEVICE_AGGREGATES
+    )
+    aggregated_devices: set[str] = set()
+
+    # Area and site rollups above the device nodes
+    rollup_tree: UniFiEnergyRollupTree | None = None
+    if config_entry.options.get(CONF_ROLLUP_AGGREGATES, DEFAULT_ROLLUP_AGGREGATES):
+
+        @callback
+        def _async_add_rollup_sensors(node_key: str, name: str) -> None:
+            """Add the total sensors of a new area or site node."""
+            _LOGGER.info("Adding total sensors for %s", name)
+            async_add_entities(
+                [
+                    UniFiTotalEnergySensor(
+                        hass, node_key, config_entry.entry_id, name=name
+                    ),
+                    UniFiTotalPowerSensor(
+                        hass, node_key, config_entry.entry_id, name=name
+                    ),
+                ],
+                True,
+            )
+
+        @callback
+        def _async_publish_nodes(nodes: Iterable[int]) -> None:
+            """Publish the total sensors of nodes whose totals changed."""
+            for node in nodes:
+                for sensor in sensors_by_node.get(node, ()):
+                    sensor._async_publish()  # noqa: SLF001
+
+        rollup_tree = UniFiEnergyRollupTree(
+            hass, accumulator, _async_add_rollup_sensors, _async_publish_nodes
+        )
+        rollup_tree.async_start()
+        config_entry.async_on_unload(rollup_tree.async_stop)
+
+    @callback
+    def _async_new_device_aggregates(device_id: str) -> list[UniFiAggregateSensor]:
+        """Add a device to the rollups, returning its new total sensors."""
+        if rollup_tree is not None:
+            rollup_tree.async_add_device(device_id)
+        if not device_aggregates_enabled or device_id in aggregated_devices:
+            return []
+        aggregated_devices.add(device_id)
+        return [
+            UniFiTotalEnergySensor(
+                hass, device_id, config_entry.entry_id, device_id=device_id
+            ),
+            UniFiTotalPowerSensor(
+                hass, device_id, config_entry.entry_id, device_id=device_id
+            ),
+        ]
+
+    update_mode = config_entry.options.get(CONF_UPDATE_MODE, DEFAULT_UPDATE_MODE)
+    hass.data[DOMAIN]["update_mode"] = update_mode
+
+    if update_mode == UPDATE_MODE_INTERVAL:
+        # One shared timer samples every tracked power entity, instead of a
+        # state change listener per sensor
+        sensors_by_entity_id = hass.data[DOMAIN]["sensors_by_entity_id"]
+
+        @callback
+        def _async_interval_tick(now: datetime) -> None:
+            """Sample all power entities and integrate them in one pass."""
+            states = hass.states
+            timestamp = now.timestamp()
+            sampled: list[UniFiEnergyAccumulationSensor] = []
+            slots: list[int] = []
+            powers: list[float] = []
+
+            for sensor in sensors_by_entity_id.values():
+                power_watts = power_from_state(
+                    states.get(sensor._poe_entity_id)  # noqa: SLF001
+                )
+                if power_watts is not None:
+                    sampled.append(sensor)
+                    slots.append(sensor._slot)  # noqa: SLF001
+                    powers.append(power_watts)
+                else:
+                    accumulator.mark_outage(sensor._slot, timestamp)  # noqa: SLF001
+
+            accumulator.integrate_batch(slots, [timestamp] * len(slots), powers)
+            energy_store.async_schedule_save()
+
+            for sensor in sampled:
+                sensor._async_publish()  # noqa: SLF001
+
+        scan_interval = config_entry.options.get(
+            CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL
+        )
+        config_entry.async_on_unload(
+            async_track_time_interval(
+                hass, _async_interval_tick, timedelta(seconds=scan_interval)
+            )
+        )
+        _LOGGER.debug("Sampling power entities every %s seconds", scan_interval)
+
+    boundary_split = config_entry.options.get(
+        CONF_BOUNDARY_SPLIT, DEFAULT_BOUNDARY_SPLIT
+    )
+    # The hourly import needs the totals at the end of every hour
+    if statistics_exporter is not None and boundary_split == BOUNDARY_SPLIT_OFF:
+        boundary_split = BOUNDARY_SPLIT_HOUR
+    if boundary_split != BOUNDARY_SPLIT_OFF:
+        # Statistics are compiled from the last state written before each
+        # period ends, so all sensors are advanced to now and written in the
+        # last second of the period. The part of each interval until now is
+        # integrated with the last power, the next sample integrates the
+        # rest. Advancing to the boundary itself would put the slots ahead of
+        # samples stamped in that last second.
+        boundary_sensors = hass.data[DOMAIN]["sensors_by_entity_id"]
+
+        @callback
+        def _async_split_at_boundary(now: datetime) -> None:
+            """Advance every sensor to now and write the changed ones."""
+            boundary = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+            accumulator.advance_batch(
+                [sensor._slot for sensor in boundary_sensors.values()],  # noqa: SLF001
+                time.time(),
+            )
+            energy_store.async_schedule_save()
+
+            # In statistics-only mode ports are imported and written hourly
+            hourly = boundary.minute == 0
+            if statistics_exporter is None or hourly:
+                for sensor in boundary_sensors.values():
+                    sensor._async_write_now()  # noqa: SLF001
+            for aggregates in sensors_by_node.values():
+                for aggregate in aggregates:
+                    aggregate._async_write_now()  # noqa: SLF001
+
+            if statistics_exporter is not None and hourly:
+                statistics_exporter.async_export(
+                    boundary - timedelta(hours=1),
+                    (
+                        (
+                            entity_id,
+                            sensor._statistic_name,  # noqa: SLF001
+                            sensor._total_energy_kwh,  # noqa: SLF001
+                        )
+                        for entity_id, sensor in boundary_sensors.items()
+                    ),
+                )
+
+        config_entry.async_on_unload(
+            async_track_utc_time_change(
+                hass,
+                _async_split_at_boundary,
+                minute=list(range(4, 60, 5))
+                if boundary_split == BOUNDARY_SPLIT_5MINUTE
+                else 59,
+                second=59,
+            )
+        )
+        _LOGGER.debug("Splitting accumulation at %s boundaries", boundary_split)
 
     # Find all UniFi PoE port and PDU outlet power entities
     power_entities = []
 
-    for entity_id, entry in entity_registry.entities.items():
-        if _is_unifi_power_entity(entry):
-            _LOGGER.debug(
-                "Found UniFi power entity: %s (device: %s)",
-                entity_id,
-                entry.device_id,
-            )
-            power_entities.append((entity_id, entry))
-            hass.data[DOMAIN]["tracked_poe_entities"].add(entity_id)
+    for entry in async_get_unifi_power_entities(hass):
+        _LOGGER.debug(
+            "Found UniFi power entity: %s (device: %s)",
+            entry.entity_id,
+            entry.device_id,
+        )
+        power_entities.append((entry.entity_id, entry))
+        hass.data[DOMAIN]["tracked_poe_entities"].add(entry.entity_id)
 
     # Create one energy sensor for each PoE port / PDU outlet
     energy_sensors = []
+    device_total_sensors = []
 
     for power_entity_id, power_entry in power_entities:
         _LOGGER.info("Creating energy sensor for power entity: %s", power_entity_id)
@@ -96,10 +837,34 @@ async def async_setup_entry(
             config_entry_id=config_entry.entry_id,
         )
         energy_sensors.append(energy_sensor)
+        device_total_sensors.extend(
+            _async_new_device_aggregates(power_entry.device_id)
+        )
 
     if energy_sensors:
-        async_add_entities(energy_sensors, True)
+        # Energy used while we were not running, from one recorder query
+        power_history = None
+        if config_entry.options.get(CONF_BACKFILL_HISTORY, DEFAULT_BACKFILL_HISTORY):
+            # Optional, a failing recorder must not stop the sensors
+            try:
+                power_history = await async_get_power_history(
+                    hass,
+                    energy_store.async_reading_times(
+                        sensor._poe_entity_id  # noqa: SLF001
+                        for sensor in energy_sensors
+                    ),
+                )
+            except Exception:
+                _LOGGER.exception("History backfill failed, continuing without it")
+
+        # Seed all sensors in one pass before adding them
+        _async_seed_sensors(hass, energy_sensors, power_history)
+        async_add_entities([*energy_sensors, *device_total_sensors], True)
         _LOGGER.info("Added %d UniFi Energy Helper energy sensors", len(energy_sensors))
+        if device_total_sensors:
+            _LOGGER.info(
+                "Added total sensors for %d UniFi devices", len(aggregated_devices)
+            )
 
         # Store energy sensor info in hass.data for button platform
         if DOMAIN not in hass.data:
@@ -157,7 +922,7 @@ async def async_setup_entry(
         registry = er.async_get(hass)
         entry = registry.async_get(entity_id)
 
-        if not entry or not _is_unifi_power_entity(entry) or not entry.device_id:
+        if not entry or not is_unifi_power_entity(entry) or not entry.device_id:
             return
 
         _LOGGER.info("Detected new/enabled UniFi power entity: %s", entity_id)
@@ -173,8 +938,11 @@ async def async_setup_entry(
             config_entry_id=config_entry.entry_id if config_entry else None,
         )
 
-        # Add the sensor
-        async_add_entities([energy_sensor], True)
+        # Add the sensor, and the device totals if this is a new device
+        _async_seed_sensors(hass, [energy_sensor])
+        async_add_entities(
+            [energy_sensor, *_async_new_device_aggregates(entry.device_id)], True
+        )
 
         # Update hass.data with new sensor info
         if "energy_sensors" not in hass.data[DOMAIN]:
@@ -203,23 +971,118 @@ async def async_setup_entry(
         if "button_add_entities" in hass.data[DOMAIN]:
             hass.data[DOMAIN]["button_add_entities"]([reset_button], True)
 
-    # Subscribe to entity registry events
+    # One reset listener for all sensors, looking up targets by entity_id
+    @callback
+    def _async_handle_reset_event(event: Event) -> None:
+        """Handle reset energy events for one or more sensors."""
+        targets = _async_resolve_reset_targets(hass, event.data)
+        if not targets:
+            _LOGGER.debug("Reset event did not match any energy sensor: %s", event.data)
+            return
+
+        for sensor in targets:
+            sensor._reset_energy()  # noqa: SLF001
+
     config_entry.async_on_unload(
-        hass.bus.async_listen(
-            er.EVENT_ENTITY_REGISTRY_UPDATED, _async_entity_registry_updated
+        hass.bus.async_listen(EVENT_RESET_ENERGY, _async_handle_reset_event)
+    )
+
+    # Subscribe to entity registry events through the shared dispatcher
+    config_entry.async_on_unload(
+        hass.data[DOMAIN]["registry_dispatcher"].async_listen_all(
+            _async_entity_registry_updated
         )
     )
 
 
-class UniFiEnergyAccumulationSensor(RestoreSensor):
-    """Representation of a UniFi energy accumulation sensor with state restoration."""
+class UniFiEnergyHelperSensor(RestoreSensor):
+    """Base class for sensors linked to an existing UniFi device."""
 
     _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        device_id: str | None,
+        config_entry_id: str | None = None,
+    ) -> None:
+        """Initialize the sensor."""
+        self.hass = hass
+        self._device_id = device_id
+
+        # Link to config entry
+        if config_entry_id:
+            self._attr_config_entry_id = config_entry_id
+
+        # Link to the existing UniFi device while being registered, so the
+        # registry is not updated on every add
+        self._attr_device_info = async_get_unifi_device_info(hass, device_id)
+
+        # Last value written to the state machine, for the publish policy
+        self._published_value: float | None = None
+        self._published_at = 0.0
+
+        # State writes are coalesced across all sensors
+        self._write_scheduler: UniFiEnergyWriteScheduler = hass.data[DOMAIN][
+            "write_scheduler"
+        ]
+        self._energy_store: UniFiEnergyStore = hass.data[DOMAIN]["energy_store"]
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and remember what was published."""
+        self._published_value = self.native_value
+        self._published_at = time.monotonic()
+        super().async_write_ha_state()
+
+    @callback
+    def _async_publish(self, reported: bool = False) -> None:
+        """Schedule a state write if the publish policy allows it."""
+        self._write_scheduler.async_publish(self, reported)
+
+    @callback
+    def _async_heartbeat(self) -> bool:
+        """Schedule a write if the value changed since the last write.
+
+        Called once the heartbeat passed since a publish was suppressed.
+        Returns True if a write was scheduled.
+        """
+        if self.native_value == self._published_value:
+            return False
+        self._write_scheduler.async_schedule_write(self)
+        return True
+
+    @callback
+    def _async_write_now(self) -> None:
+        """Write the state right away if it changed since the last write.
+
+        Bypasses the publish policy and the debounce of the write scheduler.
+        """
+        if self.native_value == self._published_value:
+            return
+        self._write_scheduler.async_cancel(self)
+        self.async_write_ha_state()
+
+
+class UniFiEnergyAccumulationSensor(UniFiEnergyHelperSensor):
+    """Representation of a UniFi energy accumulation sensor with state restoration."""
+
     _attr_device_class = SensorDeviceClass.ENERGY
     _attr_state_class = SensorStateClass.TOTAL_INCREASING
     _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
-    _attr_should_poll = False
     _attr_entity_category = EntityCategory.DIAGNOSTIC
+    # Change on every sample; recording them would store a new attributes row
+    # per state write
+    _unrecorded_attributes = frozenset(
+        {
+            ATTR_LAST_UPDATE,
+            ATTR_LAST_POWER_WATTS,
+            ATTR_INTEGRATION_ERROR_KWH,
+            ATTR_OUTAGE_COUNT,
+            ATTR_OUTAGE_SECONDS,
+        }
+    )
 
     def __init__(
         self,
@@ -230,15 +1093,10 @@ class UniFiEnergyAccumulationSensor(RestoreSensor):
         config_entry_id: str | None = None,
     ) -> None:
         """Initialize the energy sensor."""
-        self.hass = hass
-        self._device_id = device_id
+        super().__init__(hass, device_id, config_entry_id)
         self._poe_entity_id = poe_entity_id
         self._poe_entity_entry = poe_entity_entry
 
-        # Link to config entry
-        if config_entry_id:
-            self._attr_config_entry_id = config_entry_id
-
         # Extract name from the power entity (PoE port or PDU outlet)
         # Use the original name or derive from entity_id
         power_name = poe_entity_entry.original_name or poe_entity_entry.name
@@ -269,10 +1127,35 @@ class UniFiEnergyAccumulationSensor(RestoreSensor):
             # Fallback
             self._attr_unique_id = f"{poe_entity_id}_energy"
 
-        # Energy accumulation state
-        self._total_energy_kwh = 0.0
-        self._last_update_time: datetime | None = None
-        self._last_power_watts: float | None = None
+        # Energy accumulation state lives in the shared accumulator; the sensor
+        # only reads its slot
+        self._accumulator: EnergyAccumulator = hass.data[DOMAIN]["accumulator"]
+        self._slot = self._accumulator.allocate(poe_entity_id)
+
+        self._attribute_policy: str = hass.data[DOMAIN]["attribute_policy"]
+        self._static_attributes: dict[str, Any] = {
+            ATTR_POE_ENTITY_ID: poe_entity_id,
+            ATTR_INTEGRATION_METHOD: self._accumulator.method,
+        }
+        # Rendered attributes and the slot values they were rendered from
+        self._attributes_cache: dict[str, Any] | None = None
+        self._attributes_key: tuple[float, float, float, int] | None = None
+
+        self._catch_up_scheduler: UniFiEnergyCatchUpScheduler | None = hass.data[
+            DOMAIN
+        ]["catch_up_scheduler"]
+
+        # Without a state class the recorder compiles no statistics for the
+        # port; its energy is imported hourly as an external statistic
+        self._statistics_only = hass.data[DOMAIN]["statistics_exporter"] is not None
+        if self._statistics_only:
+            self._attr_state_class = None
+            self._catch_up_scheduler = None
+
+        # Total sensors of the nodes we roll up into, updated with every sample
+        self._aggregate_sensors: dict[int, list[UniFiAggregateSensor]] = hass.data[
+            DOMAIN
+        ]["aggregate_sensors"]
 
         # For tracking state changes and reset events
         self._unsub_update = None
@@ -310,38 +1193,132 @@ class UniFiEnergyAccumulationSensor(RestoreSensor):
             self.async_write_ha_state()
 
     @property
-    def device_info(self) -> dict[str, Any] | None:
-        """Return device info to link this sensor to the UniFi device."""
-        # We don't create a new device; we link to the existing UniFi device
-        # by not providing device_info. The device_id will be set in the registry.
-        return None
+    def _total_energy_kwh(self) -> float:
+        """Return the accumulated energy in kWh."""
+        return self._accumulator.total_kwh[self._slot]
+
+    @property
+    def _last_power_watts(self) -> float | None:
+        """Return the last valid power reading in W."""
+        power_watts = self._accumulator.power_watts[self._slot]
+        return None if math.isnan(power_watts) else power_watts
+
+    @property
+    def _last_update_time(self) -> datetime | None:
+        """Return the time of the last valid power reading."""
+        timestamp = self._accumulator.timestamp[self._slot]
+        return None if math.isnan(timestamp) else dt_util.utc_from_timestamp(timestamp)
 
     @property
     def native_value(self) -> float | None:
         """Return the state of the sensor."""
         return round(self._total_energy_kwh, 3)
 
+    @property
+    def _statistic_name(self) -> str:
+        """Return the name of the external statistic of this sensor."""
+        if (state := self.hass.states.get(self.entity_id)) is not None:
+            return state.name
+        return self._attr_name
+
+    @callback
+    def _async_publish(self, reported: bool = False) -> None:
+        """Schedule a state write for this sensor and its totals."""
+        # In statistics-only mode the port is only written at the hour
+        if not self._statistics_only:
+            super()._async_publish(reported)
+        self._async_publish_aggregates(reported)
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and schedule the next catch-up."""
+        super().async_write_ha_state()
+        if self._catch_up_scheduler is not None:
+            self._catch_up_scheduler.async_schedule(self, self._published_at)
+
+    @callback
+    def _async_catch_up(self, timestamp: float) -> bool:
+        """Advance the total to timestamp and write it if it changed.
+
+        Called for a sensor whose last write is older than the max age.
+        Returns True if a write was scheduled.
+        """
+        self._calculate_energy_increment(timestamp)
+        if self.native_value == self._published_value:
+            return False
+        self._write_scheduler.async_schedule_write(self)
+        self._async_publish_aggregates()
+        return True
+
+    @callback
+    def _async_publish_aggregates(self, reported: bool = False) -> None:
+        """Schedule a state write for the device, area and site totals."""
+        if not self._aggregate_sensors:
+            return
+        for node in self._accumulator.lineage(self._slot):
+            for aggregate in self._aggregate_sensors.get(node, ()):
+                aggregate._async_publish(reported)  # noqa: SLF001
+
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return the state attributes."""
+        # With the static policy the volatile values are only available
+        # through diagnostics, and the attributes never change
+        if self._attribute_policy != ATTRIBUTE_POLICY_ALL:
+            return self._static_attributes
+
+        # Only rebuild when the slot changed since the last render. A slot
+        # without readings holds NaN (never equal), which just rebuilds.
+        accumulator = self._accumulator
+        slot = self._slot
+        key = (
+            accumulator.timestamp[slot],
+            accumulator.power_watts[slot],
+            accumulator.error_kwh[slot],
+            accumulator.outage_count[slot],
+        )
+        if self._attributes_cache is None or key != self._attributes_key:
+            self._attributes_key = key
+            self._attributes_cache = {
+                **self._static_attributes,
+                **self.volatile_attributes,
+            }
+        return self._attributes_cache
+
+    @property
+    def volatile_attributes(self) -> dict[str, Any]:
+        """Return the attributes that change with every power sample."""
         return {
-            "poe_entity_id": self._poe_entity_id,
-            "last_update": self._last_update_time.isoformat()
+            ATTR_LAST_UPDATE: self._last_update_time.isoformat()
             if self._last_update_time
             else None,
-            "last_power_watts": self._last_power_watts,
+            ATTR_LAST_POWER_WATTS: self._last_power_watts,
+            ATTR_INTEGRATION_ERROR_KWH: round(
+                self._accumulator.error_kwh[self._slot], 6
+            ),
+            ATTR_OUTAGE_COUNT: self._accumulator.outage_count[self._slot],
+            ATTR_OUTAGE_SECONDS: round(
+                self._accumulator.outage_seconds[self._slot], 1
+            ),
         }
 
     async def async_internal_added_to_hass(self) -> None:
         """Call when the entity is added to hass (including when enabled)."""
         await super().async_internal_added_to_hass()
 
-        # Set up state tracking if not already set up and entity is enabled
-        if self._unsub_update is None and self.enabled:
-            self._unsub_update = async_track_state_change_event(
-                self.hass,
-                [self._poe_entity_id],
+        # Set up state tracking if not already set up and entity is enabled.
+        # In interval mode the shared timer samples the power entity instead.
+        if (
+            self._unsub_update is None
+            and self.enabled
+            and self.hass.data[DOMAIN]["update_mode"] == UPDATE_MODE_EVENT
+        ):
+            self._unsub_update = self.hass.data[DOMAIN][
+                "state_dispatcher"
+            ].async_listen(
+                self._poe_entity_id,
                 self._async_power_changed,
+                self._async_power_reported,
             )
             _LOGGER.debug("Started tracking state for %s", self._poe_entity_id)
 
@@ -357,52 +1334,25 @@ class UniFiEnergyAccumulationSensor(RestoreSensor):
         """Handle entity which will be added."""
         await super().async_added_to_hass()
 
-        # Restore previous state if available
-        last_sensor_data = await self.async_get_last_sensor_data()
-
-        if last_sensor_data and last_sensor_data.native_value is not None:
-            try:
-                # Type ignore needed as native_value can be various types
-                self._total_energy_kwh = float(last_sensor_data.native_value)  # type: ignore[arg-type]
-                _LOGGER.info(
-                    "Restored energy state for %s: %.3f kWh",
-                    self._poe_entity_id,
-                    self._total_energy_kwh,
-                )
-            except (ValueError, TypeError):
-                _LOGGER.warning(
-                    "Could not restore energy state for %s, starting from 0",
-                    self._poe_entity_id,
-                )
+        # Count towards the device totals while added. The slot was seeded
+        # with the total and the current power before the sensor was added.
+        self._accumulator.attach(
+            self._slot, self._accumulator.allocate_node(self._device_id)
+        )
+        self._async_publish_aggregates()
 
-        # Register this entity with the same device as the UniFi PoE sensors
-        # Schedule this to run after entity is fully registered
-        entity_registry = er.async_get(self.hass)
+        # Make this sensor reachable by the shared reset event listener
+        sensors_by_entity_id = self.hass.data[DOMAIN]["sensors_by_entity_id"]
+        sensors_by_entity_id[self.entity_id] = self
+        entity_id = self.entity_id
 
         @callback
-        def _async_update_device():
-            """Update device_id for this entity."""
-            if self.entity_id:
-                entity_registry.async_update_entity(
-                    self.entity_id,
-                    device_id=self._device_id,
-                )
-                _LOGGER.debug("Linked %s to device %s", self.entity_id, self._device_id)
+        def _async_remove_reset_target() -> None:
+            """Stop routing reset events to this sensor."""
+            if sensors_by_entity_id.get(entity_id) is self:
+                del sensors_by_entity_id[entity_id]
 
-        # Call the callback directly to update the device
-        _async_update_device()
-
-        # Listen for reset events
-        @callback
-        def _async_handle_reset_event(event: Event) -> None:
-            """Handle reset energy event."""
-            if event.data.get("entity_id") == self.entity_id:
-                self._reset_energy()
-
-        self._unsub_reset = self.hass.bus.async_listen(
-            f"{DOMAIN}_reset_energy",
-            _async_handle_reset_event,
-        )
+        self._unsub_reset = _async_remove_reset_target
 
         # Listen for PoE entity name changes
         @callback
@@ -410,11 +1360,7 @@ class UniFiEnergyAccumulationSensor(RestoreSensor):
             """Handle PoE entity registry updates to sync names."""
             if event.data.get("action") != "update":
                 return
-            
-            updated_entity_id = event.data.get("entity_id")
-            if updated_entity_id != self._poe_entity_id:
-                return
-            
+
             changes = event.data.get("changes", {})
             # Check if name or original_name changed
             if "name" in changes or "original_name" in changes:
@@ -423,19 +1369,15 @@ class UniFiEnergyAccumulationSensor(RestoreSensor):
                 if poe_entry:
                     self._update_name_from_poe_entity(poe_entry)
 
-        self._unsub_registry = self.hass.bus.async_listen(
-            er.EVENT_ENTITY_REGISTRY_UPDATED,
-            _async_handle_poe_registry_update,
-        )
-
-        # Initialize with current power state
-        await self._async_initialize_from_current_state()
+        # The dispatcher only calls us for our own PoE entity
+        self._unsub_registry = self.hass.data[DOMAIN][
+            "registry_dispatcher"
+        ].async_listen(self._poe_entity_id, _async_handle_poe_registry_update)
 
     async def async_will_remove_from_hass(self) -> None:
         """Handle entity removal."""
         # Calculate final energy increment before unloading
-        current_time = dt_util.utcnow()
-        self._calculate_energy_increment(current_time)
+        self._calculate_energy_increment(time.time())
 
         # Log final state if we calculated anything
         if self._last_update_time is not None and self._last_power_watts is not None:
@@ -446,8 +1388,16 @@ class UniFiEnergyAccumulationSensor(RestoreSensor):
             )
 
         # Write the final state so it gets saved
+        self._write_scheduler.async_cancel(self)
         self.async_write_ha_state()
 
+        # Our power no longer counts towards the totals
+        self._async_publish_aggregates()
+        self._accumulator.attach(self._slot, -1)
+
+        if self._catch_up_scheduler is not None:
+            self._catch_up_scheduler.async_remove(self)
+
         # Clean up listeners
         self._cleanup_listeners()
 
@@ -471,102 +1421,227 @@ class UniFiEnergyAccumulationSensor(RestoreSensor):
             self._poe_entity_id,
             self._total_energy_kwh,
         )
-        self._total_energy_kwh = 0.0
-        self._last_update_time = dt_util.utcnow()
         # Keep the last power reading to continue tracking
+        self._accumulator.reset(self._slot, time.time())
+        self._energy_store.async_schedule_save()
         self.async_write_ha_state()
 
     @callback
     def _calculate_energy_increment(
-        self, current_time: datetime, new_power_watts: float | None = None
+        self, timestamp: float, new_power_watts: float | None = None
     ) -> None:
         """Calculate and accumulate energy increment since last update.
 
         Args:
-            current_time: The current timestamp
+            timestamp: The current time as POSIX timestamp
             new_power_watts: New power reading (if any) to update tracking with
         """
-        # If we have a previous reading, calculate energy increment
-        if self._last_update_time is not None and self._last_power_watts is not None:
-            time_delta_seconds = (current_time - self._last_update_time).total_seconds()
-
-            # Only calculate if there's been some time elapsed
-            if time_delta_seconds > 0:
-                # Use the previous power value for the time period that just elapsed
-                # (riemann sum approach - using left endpoint)
-                energy_increment_kwh = (
-                    self._last_power_watts
-                    * time_delta_seconds
-                    * SECONDS_TO_HOURS
-                    * WATTS_TO_KILOWATTS
-                )
+        accumulator = self._accumulator
+        last_power_watts = self._last_power_watts
+        time_delta_seconds = timestamp - accumulator.timestamp[self._slot]
+
+        # Use the previous power value for the time period that just elapsed
+        # (riemann sum approach - using left endpoint)
+        if new_power_watts is None:
+            energy_increment_kwh = accumulator.advance(self._slot, timestamp)
+        else:
+            energy_increment_kwh = accumulator.integrate(
+                self._slot, timestamp, new_power_watts
+            )
+        self._energy_store.async_schedule_save()
 
-                self._total_energy_kwh += energy_increment_kwh
-
-                if new_power_watts is not None:
-                    _LOGGER.debug(
-                        "Energy update for %s: Power=%.2fW→%.2fW, Delta=%.1fs, Increment=%.6fkWh, Total=%.3fkWh",
-                        self._poe_entity_id,
-                        self._last_power_watts,
-                        new_power_watts,
-                        time_delta_seconds,
-                        energy_increment_kwh,
-                        self._total_energy_kwh,
-                    )
-                else:
-                    _LOGGER.debug(
-                        "Energy update for %s: Power=%.2fW, Delta=%.1fs, Increment=%.6fkWh, Total=%.3fkWh",
-                        self._poe_entity_id,
-                        self._last_power_watts,
-                        time_delta_seconds,
-                        energy_increment_kwh,
-                        self._total_energy_kwh,
-                    )
+        if last_power_watts is None or not time_delta_seconds > 0:
+            return
 
-        # Update tracking variables if new power provided
         if new_power_watts is not None:
-            self._last_power_watts = new_power_watts
-            self._last_update_time = current_time
-
-    async def _async_initialize_from_current_state(self) -> None:
-        """Initialize tracking from current power state."""
-        state = self.hass.states.get(self._poe_entity_id)
-        if state and state.state not in ("unknown", "unavailable"):
-            try:
-                self._last_power_watts = float(state.state)
-                self._last_update_time = dt_util.utcnow()
-                _LOGGER.debug(
-                    "Initialized energy tracking for %s at %.2fW",
-                    self._poe_entity_id,
-                    self._last_power_watts,
-                )
-            except (ValueError, TypeError):
-                _LOGGER.debug(
-                    "Could not initialize from current state %s: %s",
-                    self._poe_entity_id,
-                    state.state,
-                )
-        self.async_write_ha_state()
+            _LOGGER.debug(
+                "Energy update for %s: Power=%.2fW→%.2fW, Delta=%.1fs, Increment=%.6fkWh, Total=%.3fkWh",
+                self._poe_entity_id,
+                last_power_watts,
+                new_power_watts,
+                time_delta_seconds,
+                energy_increment_kwh,
+                self._total_energy_kwh,
+            )
+        else:
+            _LOGGER.debug(
+                "Energy update for %s: Power=%.2fW, Delta=%.1fs, Increment=%.6fkWh, Total=%.3fkWh",
+                self._poe_entity_id,
+                last_power_watts,
+                time_delta_seconds,
+                energy_increment_kwh,
+                self._total_energy_kwh,
+            )
 
     @callback
     def _async_power_changed(self, event) -> None:
         """Handle power entity state changes."""
-        new_state = event.data.get("new_state")
-        if not new_state or new_state.state in ("unknown", "unavailable"):
+        new_state: State | None = event.data.get("new_state")
+        if new_state is None:
             return
 
-        try:
-            new_power_watts = float(new_state.state)
-        except (ValueError, TypeError):
-            _LOGGER.debug(
-                "Invalid power reading from %s: %s",
-                self._poe_entity_id,
-                new_state.state,
-            )
-            return
+        # Integrate at the time the UniFi state was reported rather than when
+        # the callback runs, so event loop lag does not skew the intervals.
+        # The state is written together with the rest of the burst if the
+        # publish policy allows it
+        if self._async_update_from_power_state(
+            new_state, new_state.last_reported_timestamp
+        ):
+            self._async_publish()
 
-        current_time = dt_util.utcnow()
+    @callback
+    def _async_power_reported(self, event: Event) -> None:
+        """Handle the unchanged power state being reported again."""
+        new_state: State = event.data["new_state"]
+
+        # Time keeps advancing for ports drawing steady power. The total is
+        # integrated now, but only published once the report interval passed.
+        # Reports update last_reported of the same State object in place, and
+        # before 2024.6 its cached last_reported_timestamp is not refreshed
+        if self._async_update_from_power_state(
+            new_state, new_state.last_reported.timestamp()
+        ):
+            self._async_publish(reported=True)
+
+    @callback
+    def _async_update_from_power_state(
+        self, new_state: State | None, timestamp: float
+    ) -> bool:
+        """Accumulate energy from a power state sample.
+
+        Returns True if the sample was valid and has been integrated.
+        """
+        new_power_watts = power_from_state(new_state)
+        if new_power_watts is None:
+            # The gap until the next valid sample is closed with the gap policy
+            self._accumulator.mark_outage(self._slot, timestamp)
+            return False
 
         # Calculate energy increment and update tracking
-        self._calculate_energy_increment(current_time, new_power_watts)
+        self._calculate_energy_increment(timestamp, new_power_watts)
+        return True
+
+
+class UniFiAggregateSensor(UniFiEnergyHelperSensor):
+    """Base class for the totals of an aggregation node.
+
+    Nodes are UniFi devices and, with rollups enabled, areas and UniFi sites.
+    The totals are kept in the node of the shared accumulator, which adds
+    every port's increment as it is integrated.
+    """
+
+    _total_name: str
+    _unique_id_suffix: str
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        node_key: str,
+        config_entry_id: str | None = None,
+        *,
+        device_id: str | None = None,
+        name: str | None = None,
+    ) -> None:
+        """Initialize the total sensor.
+
+        Args:
+            hass: Home Assistant instance
+            node_key: Key of the accumulator node (the device_id for devices)
+            config_entry_id: Config entry to link the sensor to
+            device_id: UniFi device to link the sensor to, if any
+            name: Name of the area or site, prefixed to the sensor name
+        """
+        super().__init__(hass, device_id, config_entry_id)
+        self._attr_name = f"{name} {self._total_name}" if name else self._total_name
+        self._attr_unique_id = f"{node_key}_{self._unique_id_suffix}"
+        self._accumulator: EnergyAccumulator = hass.data[DOMAIN]["accumulator"]
+        self._node_key = node_key
+        self._node = self._accumulator.allocate_node(node_key)
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity which will be added."""
+        await super().async_added_to_hass()
+
+        # Let the port sensors below our node publish us with every sample
+        aggregates = self.hass.data[DOMAIN]["aggregate_sensors"].setdefault(
+            self._node, []
+        )
+        aggregates.append(self)
+
+        @callback
+        def _async_remove_aggregate() -> None:
+            """Stop publishing this sensor with port samples."""
+            if self in aggregates:
+                aggregates.remove(self)
+
+        self.async_on_remove(_async_remove_aggregate)
+
+
+class UniFiTotalEnergySensor(UniFiAggregateSensor):
+    """Total energy of all ports and outlets below an aggregation node."""
+
+    _total_name = "Total Energy"
+    _attr_device_class = SensorDeviceClass.ENERGY
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_native_unit_of_measurement = UnitOfEnergy.KILO_WATT_HOUR
+    _unique_id_suffix = "total_energy"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the state of the sensor."""
+        return round(self._accumulator.node_total_kwh[self._node], 3)
+
+    async def async_added_to_hass(self) -> None:
+        """Handle entity which will be added."""
+        # Restore before registering, so the first publish has the full total.
+        # Ports may already have integrated into the node, so add to it.
+        # The energy store is preferred, the restore state is the fallback
+        restored = self._energy_store.async_restore_node(self._node_key, self._node)
+        last_sensor_data = (
+            None if restored else await self.async_get_last_sensor_data()
+        )
+        if last_sensor_data and last_sensor_data.native_value is not None:
+            try:
+                self._accumulator.node_total_kwh[self._node] += float(
+                    last_sensor_data.native_value  # type: ignore[arg-type]
+                )
+            except (ValueError, TypeError):
+                _LOGGER.warning(
+                    "Could not restore %s, starting from 0", self._attr_unique_id
+                )
+
+        await super().async_added_to_hass()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Handle entity removal."""
+        # Write the final state so it gets saved
+        self._write_scheduler.async_cancel(self)
         self.async_write_ha_state()
+
+
+class UniFiTotalPowerSensor(UniFiAggregateSensor):
+    """Total power of all ports and outlets below an aggregation node."""
+
+    _total_name = "Total Power"
+    _attr_device_class = SensorDeviceClass.POWER
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfPower.WATT
+    _unique_id_suffix = "total_power"
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the state of the sensor."""
+        # The running sum of power changes can drift just below zero
+        return max(round(self._accumulator.node_power_watts[self._node], 2), 0.0)
+
+    @callback
+    def _async_publish(self, reported: bool = False) -> None:
+        """Schedule a state write; the publish policy only applies to energy."""
+        # A report repeats the power of the port, so the total is unchanged
+        if not reported:
+            self._write_scheduler.async_schedule_write(self)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Handle entity removal."""
+        # A pending write must not run after the entity is removed
+        self._write_scheduler.async_cancel(self)
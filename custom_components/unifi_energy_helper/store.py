@@ -0,0 +1,158 @@
+"""Persistent energy store for UniFi Energy Helper."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import logging
+import math
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .accumulator import EnergyAccumulator
+from .const import STORAGE_KEY, STORAGE_VERSION
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _nan_to_none(value: float) -> float | None:
+    """Return value, or None for NaN which JSON cannot hold."""
+    return None if math.isnan(value) else value
+
+
+def _stored_reading(
+    stored: list[float | None] | None,
+) -> tuple[float, float, float | None] | None:
+    """Return the last power, its time and the outage start of a slot entry."""
+    # Documents of earlier versions only hold the totals
+    if stored is None or len(stored) < 5 or None in stored[2:4]:
+        return None
+    return stored[2], stored[3], stored[4]  # type: ignore[return-value]
+
+
+class UniFiEnergyStore:
+    """Persist the totals of all ports and aggregation nodes in one document.
+
+    The document is read once at startup and written behind the accumulator
+    with `Store.async_delay_save`, at most once per save delay for the whole
+    fleet. Only slots and nodes restored by an added sensor are written, so
+    totals of sensors that are disabled (or not added yet) are kept as stored.
+
+    Next to its totals, a slot keeps its last reading and the start of its
+    outage, if any. A restored reading is in an outage since the time it was
+    last valid, so the downtime is closed with the gap policy.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, accumulator: EnergyAccumulator, save_delay: float
+    ) -> None:
+        """Initialize the store."""
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._accumulator = accumulator
+        self._save_delay = save_delay
+        self._save_pending = False
+
+        # Stored totals, and the slots and nodes that own their key now
+        self._stored_slots: dict[str, list[float | None]] = {}
+        self._stored_nodes: dict[str, float] = {}
+        self._live_slots: dict[str, int] = {}
+        self._live_nodes: dict[str, int] = {}
+
+    async def async_load(self) -> None:
+        """Read the stored totals."""
+        data = await self._store.async_load() or {}
+        self._stored_slots = data.get("slots", {})
+        self._stored_nodes = data.get("nodes", {})
+        _LOGGER.debug(
+            "Loaded stored energy for %d ports and %d totals",
+            len(self._stored_slots),
+            len(self._stored_nodes),
+        )
+
+    @callback
+    def async_restore_slot(self, key: str, slot: int) -> bool:
+        """Restore a port slot, returning False if nothing was stored for it.
+
+        From now on the slot is persisted, whether it was restored or not.
+        """
+        self._live_slots[key] = slot
+        stored = self._stored_slots.get(key)
+        if stored is None:
+            return False
+        accumulator = self._accumulator
+        accumulator.total_kwh[slot] = stored[0]
+        accumulator.error_kwh[slot] = stored[1]
+
+        if (reading := _stored_reading(stored)) is not None:
+            power_watts, timestamp, outage_since = reading
+            accumulator.set_reading(slot, timestamp, power_watts)
+            accumulator.mark_outage(
+                slot, timestamp if outage_since is None else outage_since
+            )
+        return True
+
+    @callback
+    def async_reading_times(self, keys: Iterable[str]) -> dict[str, float]:
+        """Return the time of the stored last reading of each key having one."""
+        reading_times: dict[str, float] = {}
+        for key in keys:
+            if (reading := _stored_reading(self._stored_slots.get(key))) is not None:
+                reading_times[key] = reading[1]
+        return reading_times
+
+    @callback
+    def async_restore_node(self, key: str, node: int) -> bool:
+        """Restore a node total, returning False if nothing was stored for it.
+
+        Ports may already have integrated into the node, so the stored total
+        is added. From now on the node is persisted.
+        """
+        self._live_nodes[key] = node
+        stored = self._stored_nodes.get(key)
+        if stored is None:
+            return False
+        self._accumulator.node_total_kwh[node] += stored
+        return True
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save the totals once the save delay has passed."""
+        # async_delay_save postpones a pending write with every call, so only
+        # schedule when none is pending to bound how old the document gets
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, self._save_delay)
+
+    async def async_save(self) -> None:
+        """Save the totals now, e.g. when the config entry is unloaded."""
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the document with the current totals."""
+        self._save_pending = False
+        accumulator = self._accumulator
+        return {
+            "slots": {
+                **self._stored_slots,
+                **{
+                    key: [
+                        accumulator.total_kwh[slot],
+                        accumulator.error_kwh[slot],
+                        _nan_to_none(accumulator.power_watts[slot]),
+                        _nan_to_none(accumulator.timestamp[slot]),
+                        _nan_to_none(accumulator.outage_since[slot]),
+                    ]
+                    for key, slot in self._live_slots.items()
+                },
+            },
+            "nodes": {
+                **self._stored_nodes,
+                **{
+                    key: accumulator.node_total_kwh[node]
+                    for key, node in self._live_nodes.items()
+                },
+            },
+        }
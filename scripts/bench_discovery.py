@@ -0,0 +1,166 @@
+"""Benchmark the discovery of UniFi power entities in a large entity registry.
+
+Runs an in-process Home Assistant with a synthetic entity registry: UniFi PoE
+power sensors, other UniFi entities (client trackers) and entities of other
+integrations, some of them power sensors with "port" in their entity_id.
+Reports the time to find the power entities by scanning the whole registry,
+as earlier versions did, and through the registry's config entry index, as
+async_get_unifi_power_entities does, and the time to set up UniFi Energy
+Helper with that registry.
+
+Needs Home Assistant 2024.5 or later and its test helpers:
+
+    pip install pytest-homeassistant-custom-component
+    python scripts/bench_discovery.py --entities 50000 --ports 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import statistics
+import tempfile
+import time
+
+from bench_update_modes import DOMAIN, async_add_power_sensors
+
+# pylint: disable=wrong-import-order
+from homeassistant import loader
+from homeassistant.components.sensor import SensorDeviceClass
+from homeassistant.const import UnitOfPower
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+from custom_components.unifi_energy_helper.discovery import (
+    async_get_unifi_power_entities,
+)
+
+
+def is_unifi_power_entity_scan(entry: er.RegistryEntry) -> bool:
+    """Check an entry like the full registry scan of earlier versions did."""
+    if not (
+        entry.platform == "unifi"
+        and entry.entity_id.startswith("sensor.")
+        and entry.device_id
+        and entry.original_device_class == SensorDeviceClass.POWER
+        and entry.unit_of_measurement == UnitOfPower.WATT
+        and entry.disabled_by is None
+    ):
+        return False
+    entity_lower = entry.entity_id.lower()
+    unique_lower = entry.unique_id.lower() if entry.unique_id else ""
+    return bool(
+        "port" in entity_lower
+        or "poe" in entity_lower
+        or "outlet" in entity_lower
+        or "pdu" in entity_lower
+        or "port" in unique_lower
+        or "poe" in unique_lower
+        or "outlet" in unique_lower
+        or "pdu" in unique_lower
+    )
+
+
+def scan_registry(hass: HomeAssistant) -> list[er.RegistryEntry]:
+    """Return the power entities by scanning every registry entry."""
+    return [
+        entry
+        for entry in er.async_get(hass).entities.values()
+        if is_unifi_power_entity_scan(entry)
+    ]
+
+
+def add_other_entities(hass: HomeAssistant, unifi_other: int, other: int) -> None:
+    """Register UniFi client trackers and entities of another integration."""
+    ent_reg = er.async_get(hass)
+    unifi = hass.config_entries.async_get_entry("unifi")
+    for client in range(unifi_other):
+        ent_reg.async_get_or_create(
+            "device_tracker", "unifi", f"client-{client}", config_entry=unifi
+        )
+    other_entry = MockConfigEntry(domain="other", entry_id="other")
+    other_entry.add_to_hass(hass)
+    for entity in range(other):
+        # Every tenth is a power sensor the keyword match has to look at
+        power = entity % 10 == 0
+        ent_reg.async_get_or_create(
+            "sensor",
+            "other",
+            f"other-{entity}",
+            config_entry=other_entry,
+            original_device_class="power" if power else None,
+            unit_of_measurement="W" if power else None,
+            suggested_object_id=f"other_port_{entity}" if power else None,
+        )
+
+
+def median_ms(
+    func: Callable[[HomeAssistant], list[er.RegistryEntry]],
+    hass: HomeAssistant,
+    repeat: int,
+) -> tuple[float, int]:
+    """Return the median milliseconds of a discovery and the entities it found."""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = func(hass)
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1e3, len(found)
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Build the registry, then time both discoveries and the setup."""
+    other = args.entities - args.ports - args.unifi_other
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+            await async_add_power_sensors(hass, args.ports)
+            add_other_entities(hass, args.unifi_other, other)
+            await hass.async_block_till_done()
+            entries = len(er.async_get(hass).entities)
+
+            scan_ms, scan_found = median_ms(scan_registry, hass, args.repeat)
+            index_ms, index_found = median_ms(
+                async_get_unifi_power_entities, hass, args.repeat
+            )
+            assert scan_found == index_found == args.ports
+
+            entry = MockConfigEntry(domain=DOMAIN)
+            entry.add_to_hass(hass)
+            started = time.perf_counter()
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            setup = time.perf_counter() - started
+            await hass.async_stop(force=True)
+
+    print(
+        f"{entries} registry entries: {args.ports} UniFi "
+        f"power, {args.unifi_other} other UniFi, {other} other, "
+        f"median of {args.repeat}"
+    )
+    print(f"{'full scan':<20}{scan_ms:>10.2f} ms")
+    print(f"{'config entry index':<20}{index_ms:>10.2f} ms")
+    print(f"{'setup':<20}{setup:>10.2f} s")
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--entities", type=int, default=50000, help="registry entries in total"
+    )
+    parser.add_argument("--ports", type=int, default=2000, help="UniFi power sensors")
+    parser.add_argument(
+        "--unifi-other", type=int, default=2000, help="other UniFi entities"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="runs per discovery")
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
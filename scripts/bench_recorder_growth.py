@@ -0,0 +1,197 @@
+"""Measure the recorder database growth of the energy sensors.
+
+Runs an in-process Home Assistant with the recorder on a SQLite file and
+simulated UniFi PoE power sensors, and simulates a day of UniFi polls like
+bench_update_modes.py. Reports the rows the energy sensors added to the states
+and state_attributes tables, and the bytes of both tables and their indexes
+over a run without UniFi Energy Helper. Statistics are not compiled, they
+are the same for all variants. Variants:
+
+- before: the volatile attributes are recorded, as before they were excluded
+- after: the default attribute_policy all, volatile attributes not recorded
+- static: attribute_policy static, volatile attributes not in the state
+
+Needs Home Assistant 2024.5 or later and its test helpers:
+
+    pip install pytest-homeassistant-custom-component
+    python scripts/bench_recorder_growth.py --ports 24 --hours 24
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import random
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+from bench_update_modes import DOMAIN, VirtualClock, async_add_power_sensors
+
+# pylint: disable=wrong-import-order
+from homeassistant import loader
+from homeassistant.components.recorder import Recorder
+from homeassistant.components.sensor import SensorEntity
+from homeassistant.helpers import recorder as recorder_helper
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+from pytest_homeassistant_custom_component.components.recorder.common import (
+    async_wait_recording_done,
+)
+
+from custom_components.unifi_energy_helper.sensor import (
+    UniFiEnergyAccumulationSensor,
+)
+
+VARIANTS = {
+    "baseline": None,
+    "before": {},
+    "after": {},
+    "static": {"attribute_policy": "static"},
+}
+_TABLES = ("states", "state_attributes")
+
+
+def table_usage(
+    db_path: Path, entity_ids: list[str]
+) -> dict[str, tuple[int, int]]:
+    """Return the rows of the entities and the bytes of each table with its indexes."""
+    with sqlite3.connect(db_path) as connection:
+        pages = dict(
+            connection.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name")
+        )
+        index_tables = dict(
+            connection.execute(
+                "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index'"
+            )
+        )
+        entities = (
+            "FROM states JOIN states_meta USING (metadata_id) "
+            f"WHERE states_meta.entity_id IN ({', '.join('?' * len(entity_ids))})"
+        )
+        rows = {
+            "states": connection.execute(
+                f"SELECT COUNT(*) {entities}", entity_ids
+            ).fetchone()[0],
+            "state_attributes": connection.execute(
+                f"SELECT COUNT(DISTINCT attributes_id) {entities}", entity_ids
+            ).fetchone()[0],
+        }
+    return {
+        table: (
+            rows[table],
+            sum(
+                size
+                for name, size in pages.items()
+                if name == table or index_tables.get(name) == table
+            ),
+        )
+        for table in _TABLES
+    }
+
+
+async def async_run(
+    variant: str, args: argparse.Namespace
+) -> dict[str, tuple[int, int]]:
+    """Simulate the polls of one variant and return its table usage."""
+    rng = random.Random(0)
+    combined = UniFiEnergyAccumulationSensor._Entity__combined_unrecorded_attributes  # noqa: SLF001
+    if variant == "before":
+        UniFiEnergyAccumulationSensor._Entity__combined_unrecorded_attributes = (  # noqa: SLF001
+            SensorEntity._Entity__combined_unrecorded_attributes  # noqa: SLF001
+        )
+    try:
+        with (
+            tempfile.TemporaryDirectory() as config_dir,
+            patch.object(Recorder, "async_periodic_statistics"),
+            patch.object(Recorder, "_schedule_compile_missing_statistics"),
+        ):
+            db_path = Path(config_dir, "home-assistant_v2.db")
+            async with async_test_home_assistant(config_dir=config_dir) as hass:
+                hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+                recorder_helper.async_initialize_recorder(hass)
+                assert await async_setup_component(
+                    hass,
+                    "recorder",
+                    {"recorder": {"db_url": f"sqlite:///{db_path}", "auto_purge": False}},
+                )
+                await hass.async_start()
+                entity_ids = await async_add_power_sensors(hass, args.ports)
+                if (options := VARIANTS[variant]) is not None:
+                    entry = MockConfigEntry(domain=DOMAIN, options=options)
+                    entry.add_to_hass(hass)
+                    assert await hass.config_entries.async_setup(entry.entry_id)
+                await async_wait_recording_done(hass)
+
+                values = dict.fromkeys(entity_ids, 5.0)
+                changed = max(1, round(args.ports * args.changed))
+                polls_per_hour = round(3600 / args.poll)
+                with VirtualClock() as clock:
+                    for poll in range(round(args.hours) * polls_per_hour):
+                        clock.offset += args.poll
+                        for entity_id in rng.sample(entity_ids, changed):
+                            values[entity_id] = round(rng.uniform(1.0, 15.0), 1)
+                        for entity_id, value in values.items():
+                            hass.states.async_set(entity_id, str(value))
+                        await asyncio.sleep(0)
+                        await hass.async_block_till_done()
+                        if poll % polls_per_hour == polls_per_hour - 1:
+                            await async_wait_recording_done(hass)
+                    energy_ids = list(
+                        hass.data.get(DOMAIN, {}).get("sensors_by_entity_id", ())
+                    )
+                    await hass.async_stop(force=True)
+            return table_usage(db_path, energy_ids)
+    finally:
+        UniFiEnergyAccumulationSensor._Entity__combined_unrecorded_attributes = (  # noqa: SLF001
+            combined
+        )
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run every variant and print the growth per port and day."""
+    results = {variant: await async_run(variant, args) for variant in VARIANTS}
+
+    scale = 24 / args.hours / args.ports
+    print(
+        f"{args.ports} ports, {args.hours:g} h, poll every {args.poll:g} s, "
+        f"{args.changed:.0%} changed per poll, per port and day"
+    )
+    print(
+        f"{'variant':<10}{'states rows':>13}{'states KB':>11}"
+        f"{'attr rows':>11}{'attr KB':>9}{'total KB':>10}"
+    )
+    baseline = results.pop("baseline")
+    for variant, usage in results.items():
+        cells = []
+        total = 0.0
+        for table in _TABLES:
+            rows, size = usage[table]
+            kilobytes = (size - baseline[table][1]) * scale / 1024
+            total += kilobytes
+            cells.append((rows * scale, kilobytes))
+        (states_rows, states_kb), (attr_rows, attr_kb) = cells
+        print(
+            f"{variant:<10}{states_rows:>13.0f}{states_kb:>11.1f}"
+            f"{attr_rows:>11.0f}{attr_kb:>9.1f}{total:>10.1f}"
+        )
+
+
+def main() -> None:
+    """Parse the arguments and run the measurement."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ports", type=int, default=24, help="power sensors")
+    parser.add_argument("--poll", type=float, default=30.0, help="seconds between polls")
+    parser.add_argument(
+        "--changed", type=float, default=0.2, help="fraction of ports changed per poll"
+    )
+    parser.add_argument("--hours", type=float, default=24.0, help="simulated hours")
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
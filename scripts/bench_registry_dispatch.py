@@ -0,0 +1,149 @@
+"""Measure the cost of an entity registry event as the number of ports grows.
+
+Runs an in-process Home Assistant with simulated UniFi PoE power sensors and
+UniFi Energy Helper, and updates entity registry entries: the name of an
+entity the integration does not track, and the name of one energy sensor
+(which its reset button follows). For each number of ports it reports the
+EVENT_ENTITY_REGISTRY_UPDATED bus listeners the integration registered, the
+calls into the integration per registry event, and the time per event. With
+the shared registry dispatcher the listeners and calls stay constant, however
+many ports are tracked.
+
+Needs Home Assistant 2024.5 or later and its test helpers:
+
+    pip install pytest-homeassistant-custom-component
+    python scripts/bench_registry_dispatch.py --ports 24 96 384 1536
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+import tempfile
+import time
+from types import FrameType
+from typing import Any
+
+from bench_update_modes import DOMAIN, async_add_power_sensors
+
+# pylint: disable=wrong-import-order
+from homeassistant import loader
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+_INTEGRATION_DIR = str(
+    Path(__file__).resolve().parents[1] / "custom_components" / DOMAIN
+)
+
+
+class CallCounter:
+    """Count the Python function calls into the integration."""
+
+    def __init__(self) -> None:
+        """Initialize the counter."""
+        self.calls = 0
+
+    def _profile(self, frame: FrameType, event: str, arg: Any) -> None:
+        """Count a call of a function defined in the integration."""
+        if event == "call" and frame.f_code.co_filename.startswith(_INTEGRATION_DIR):
+            self.calls += 1
+
+    def __enter__(self) -> CallCounter:
+        """Start counting."""
+        sys.setprofile(self._profile)
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Stop counting."""
+        sys.setprofile(None)
+
+
+async def async_update_names(
+    hass: HomeAssistant, entity_id: str, events: int
+) -> None:
+    """Rename an entity in the registry, once per event."""
+    ent_reg = er.async_get(hass)
+    for event in range(events):
+        ent_reg.async_update_entity(entity_id, name=f"Name {event}")
+        await hass.async_block_till_done()
+
+
+async def async_run(
+    ports: int, args: argparse.Namespace
+) -> dict[str, tuple[int, float, float]]:
+    """Return the listeners, calls per event and µs per event of each case."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+            await async_add_power_sensors(hass, ports)
+            other = er.async_get(hass).async_get_or_create(
+                "sensor", "other", "other", suggested_object_id="other"
+            )
+            listeners_before = hass.bus.async_listeners().get(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, 0
+            )
+            entry = MockConfigEntry(domain=DOMAIN)
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await hass.async_block_till_done()
+            listeners = (
+                hass.bus.async_listeners().get(er.EVENT_ENTITY_REGISTRY_UPDATED, 0)
+                - listeners_before
+            )
+            energy_entity_id = next(
+                iter(hass.data[DOMAIN]["sensors_by_entity_id"])
+            )
+
+            results = {}
+            for case, entity_id in (
+                ("untracked", other.entity_id),
+                ("energy", energy_entity_id),
+            ):
+                with CallCounter() as counter:
+                    await async_update_names(hass, entity_id, args.events)
+                started = time.perf_counter()
+                await async_update_names(hass, entity_id, args.events)
+                used = time.perf_counter() - started
+                results[case] = (
+                    listeners,
+                    counter.calls / args.events,
+                    used / args.events * 1e6,
+                )
+            await hass.async_stop(force=True)
+    return results
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run every number of ports and print the cost per registry event."""
+    print(f"{args.events} registry events per case")
+    print(
+        f"{'ports':>6}  {'case':<10}{'listeners':>10}{'calls/event':>13}"
+        f"{'us/event':>10}"
+    )
+    for ports in args.ports:
+        for case, (listeners, calls, used) in (await async_run(ports, args)).items():
+            print(
+                f"{ports:>6}  {case:<10}{listeners:>10}{calls:>13.1f}{used:>10.1f}"
+            )
+
+
+def main() -> None:
+    """Parse the arguments and run the measurement."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--ports", type=int, nargs="+", default=[24, 96, 384, 1536], help="power sensors"
+    )
+    parser.add_argument(
+        "--events", type=int, default=200, help="registry events per case"
+    )
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Microbenchmark the clock and interval arithmetic of one power sample.
+
+Every power sample is stamped with the current time and integrated over the
+time since the previous sample. Earlier versions did this with timezone aware
+datetimes (dt_util.utcnow() and a timedelta), the sample path now uses float
+POSIX seconds (time.time() and a float subtraction). Times both per sample.
+
+Needs Home Assistant for dt_util:
+
+    python scripts/bench_sample_clock.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+import timeit
+
+from homeassistant.util import dt as dt_util
+
+
+def datetime_sample(last: list) -> float:
+    """Stamp a sample and return the seconds since the last one, as before."""
+    now = dt_util.utcnow()
+    elapsed = (now - last[0]).total_seconds()
+    last[0] = now
+    return elapsed
+
+
+def float_sample(last: list) -> float:
+    """Stamp a sample and return the seconds since the last one, as now."""
+    now = time.time()
+    elapsed = now - last[0]
+    last[0] = now
+    return elapsed
+
+
+def main() -> None:
+    """Parse the arguments and run the microbenchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=1_000_000, help="per run")
+    parser.add_argument("--repeat", type=int, default=7, help="runs per variant")
+    args = parser.parse_args()
+
+    print(f"{args.samples} samples, median of {args.repeat}")
+    for name, sample, first in (
+        ("datetime", datetime_sample, dt_util.utcnow),
+        ("float", float_sample, time.time),
+    ):
+        last = [first()]
+        runs = timeit.repeat(
+            lambda: sample(last),  # noqa: B023
+            number=args.samples,
+            repeat=args.repeat,
+        )
+        print(f"{name:<10}{statistics.median(runs) / args.samples * 1e9:>8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Measure the time-to-ready of UniFi Energy Helper at setup.
+
+Runs an in-process Home Assistant with simulated UniFi PoE power sensors in a
+temporary config directory: a first start, which registers the energy sensors
+and reset buttons and accumulates an hour of energy, then a restart on the
+same config directory, which restores the totals. Reports the wall time from
+setting up the config entry until every energy sensor has a state and Home
+Assistant is idle.
+
+Needs Home Assistant 2024.5 or later and its test helpers:
+
+    pip install pytest-homeassistant-custom-component
+    python scripts/bench_startup.py --ports 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from bench_update_modes import DOMAIN, VirtualClock, async_add_power_sensors
+
+# pylint: disable=wrong-import-order
+from homeassistant import loader
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+
+async def async_start(config_dir: str, ports: int) -> tuple[float, float]:
+    """Start Home Assistant with the helper and stop it again.
+
+    Returns the time-to-ready in seconds and the total energy of all ports
+    when ready. The first start accumulates an hour of 10 W on every port
+    before stopping, for the restart to restore.
+    """
+    async with async_test_home_assistant(config_dir=config_dir) as hass:
+        hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+        entity_ids = await async_add_power_sensors(hass, ports)
+        entry = MockConfigEntry(domain=DOMAIN, entry_id="helper")
+        entry.add_to_hass(hass)
+
+        started = time.perf_counter()
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        ready = time.perf_counter() - started
+
+        sensors = hass.data[DOMAIN]["sensors_by_entity_id"]
+        assert len(sensors) == ports
+        energy_kwh = sum(
+            float(hass.states.get(entity_id).state) for entity_id in sensors
+        )
+        if energy_kwh == 0:
+            with VirtualClock() as clock:
+                clock.offset = 3600
+                for entity_id in entity_ids:
+                    hass.states.async_set(entity_id, "10.0")
+                await hass.async_block_till_done()
+                await hass.async_stop(force=True)
+        else:
+            await hass.async_stop(force=True)
+    return ready, energy_kwh
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Start and restart a few times and print the time-to-ready."""
+    firsts = []
+    restarts = []
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory() as config_dir:
+            firsts.append((await async_start(config_dir, args.ports))[0])
+            restarts.append(await async_start(config_dir, args.ports))
+
+    print(f"{args.ports} ports, median of {args.repeat}")
+    print(f"{'first start':<14}{statistics.median(firsts):>8.2f} s")
+    print(
+        f"{'restart':<14}{statistics.median(ready for ready, _ in restarts):>8.2f} s"
+        f"  ({restarts[-1][1]:.2f} kWh restored)"
+    )
+
+
+def main() -> None:
+    """Parse the arguments and run the measurement."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ports", type=int, default=1000, help="power sensors")
+    parser.add_argument("--repeat", type=int, default=5, help="runs")
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
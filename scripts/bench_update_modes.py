@@ -0,0 +1,199 @@
+"""Benchmark the CPU cost of the event and interval update modes.
+
+Runs an in-process Home Assistant with simulated UniFi PoE power sensors and
+measures the process CPU time of one simulated hour of UniFi polls, once
+without UniFi Energy Helper (the baseline) and once per update mode. Every
+poll sets all power sensors: a fraction of them to a new value (a state
+change), the rest to their current value (a state report). Time is simulated
+by offsetting time.time and time.monotonic, so timers fire as they would in an
+hour without waiting for it.
+
+Needs Home Assistant 2024.5 or later and its test helpers:
+
+    pip install pytest-homeassistant-custom-component
+    python scripts/bench_update_modes.py --ports 96 --poll 30 --changed 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from datetime import timedelta
+from pathlib import Path
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# pylint: disable=wrong-import-position
+from homeassistant.core import HomeAssistant  # noqa: E402
+from homeassistant import loader  # noqa: E402
+from homeassistant.helpers import (  # noqa: E402
+    device_registry as dr,
+    entity_registry as er,
+    event,
+)
+from homeassistant.util import dt as dt_util  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_test_home_assistant,
+)
+
+DOMAIN = "unifi_energy_helper"
+PORTS_PER_SWITCH = 24
+
+
+class VirtualClock:
+    """Offset the clocks of Python and Home Assistant to simulate time passing."""
+
+    def __init__(self) -> None:
+        """Initialize the clock at the real time."""
+        self.offset = 0.0
+        self._time = time.time
+        self._monotonic = time.monotonic
+        self._utcnow = dt_util.utcnow
+
+    def __enter__(self) -> VirtualClock:
+        """Patch the clocks."""
+        time.time = lambda: self._time() + self.offset
+        time.monotonic = lambda: self._monotonic() + self.offset
+        dt_util.utcnow = lambda: self._utcnow() + timedelta(seconds=self.offset)
+        # The time trackers bind the clocks at import
+        event.time_tracker_timestamp = time.time
+        event.time_tracker_utcnow = dt_util.utcnow
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        """Restore the clocks."""
+        time.time = event.time_tracker_timestamp = self._time
+        time.monotonic = self._monotonic
+        dt_util.utcnow = event.time_tracker_utcnow = self._utcnow
+
+
+async def async_add_power_sensors(hass: HomeAssistant, ports: int) -> list[str]:
+    """Register UniFi PoE power sensors and set their first state."""
+    hass.config.components.add("unifi")
+    unifi = MockConfigEntry(domain="unifi", entry_id="unifi")
+    unifi.add_to_hass(hass)
+    dev_reg = dr.async_get(hass)
+    ent_reg = er.async_get(hass)
+
+    entity_ids = []
+    for port in range(ports):
+        switch = port // PORTS_PER_SWITCH
+        device = dev_reg.async_get_or_create(
+            config_entry_id=unifi.entry_id,
+            identifiers={("unifi", f"switch_{switch}")},
+            name=f"Switch {switch}",
+        )
+        entry = ent_reg.async_get_or_create(
+            "sensor",
+            "unifi",
+            f"poe_power-switch_{switch}_{port}",
+            config_entry=unifi,
+            device_id=device.id,
+            original_device_class="power",
+            unit_of_measurement="W",
+            original_name=f"Port {port} PoE Power",
+            suggested_object_id=f"switch_{switch}_port_{port}_poe_power",
+        )
+        hass.states.async_set(entry.entity_id, "5.0")
+        entity_ids.append(entry.entity_id)
+    await hass.async_block_till_done()
+    return entity_ids
+
+
+async def async_run(
+    mode: str | None, args: argparse.Namespace
+) -> tuple[float, float]:
+    """Return the CPU seconds per simulated hour and the energy of all ports.
+
+    Without a mode UniFi Energy Helper is not set up.
+    """
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as config_dir:
+        async with async_test_home_assistant(config_dir=config_dir) as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS)
+            entity_ids = await async_add_power_sensors(hass, args.ports)
+            if mode is not None:
+                entry = MockConfigEntry(
+                    domain=DOMAIN,
+                    options={"update_mode": mode, "scan_interval": args.scan_interval},
+                )
+                entry.add_to_hass(hass)
+                assert await hass.config_entries.async_setup(entry.entry_id)
+                await hass.async_block_till_done()
+
+            values = dict.fromkeys(entity_ids, 5.0)
+            changed = max(1, round(args.ports * args.changed))
+            with VirtualClock() as clock:
+                started = time.process_time()
+                for _ in range(round(args.hours * 3600 / args.poll)):
+                    clock.offset += args.poll
+                    for entity_id in rng.sample(entity_ids, changed):
+                        values[entity_id] = round(rng.uniform(1.0, 15.0), 1)
+                    for entity_id, value in values.items():
+                        hass.states.async_set(entity_id, str(value))
+                    await asyncio.sleep(0)
+                    await hass.async_block_till_done()
+                used = time.process_time() - started
+            energy_kwh = sum(
+                float(state.state)
+                for entity_id in hass.data.get(DOMAIN, {}).get("sensors_by_entity_id", {})
+                if (state := hass.states.get(entity_id)) is not None
+            )
+            await hass.async_stop(force=True)
+    return used / args.hours, energy_kwh
+
+
+async def async_main(args: argparse.Namespace) -> None:
+    """Run every mode and print the CPU per simulated hour."""
+    results: dict[str, list[tuple[float, float]]] = {}
+    for _ in range(args.repeat):
+        for name, mode in (
+            ("baseline", None),
+            ("event", "event"),
+            ("interval", "interval"),
+        ):
+            results.setdefault(name, []).append(await async_run(mode, args))
+
+    baseline = statistics.median(used for used, _ in results["baseline"])
+    polls = round(3600 / args.poll)
+    print(
+        f"{args.ports} ports, poll every {args.poll:g} s, "
+        f"{args.changed:.0%} changed per poll, scan_interval {args.scan_interval:g} s, "
+        f"median of {args.repeat}"
+    )
+    print(
+        f"{'mode':<10}{'CPU s/h':>10}{'helper s/h':>12}{'us/update':>11}{'kWh':>9}"
+    )
+    for name, runs in results.items():
+        used = statistics.median(used for used, _ in runs)
+        helper = used - baseline
+        print(
+            f"{name:<10}{used:>10.3f}{helper:>12.3f}"
+            f"{helper / (polls * args.ports) * 1e6:>11.1f}{runs[-1][1]:>9.3f}"
+        )
+
+
+def main() -> None:
+    """Parse the arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ports", type=int, default=96, help="power sensors")
+    parser.add_argument("--poll", type=float, default=30.0, help="seconds between polls")
+    parser.add_argument(
+        "--changed", type=float, default=0.2, help="fraction of ports changed per poll"
+    )
+    parser.add_argument(
+        "--scan-interval", type=float, default=60.0, help="interval mode tick seconds"
+    )
+    parser.add_argument("--hours", type=float, default=1.0, help="simulated hours")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode")
+    asyncio.run(async_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()